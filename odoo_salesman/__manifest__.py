@@ -4,8 +4,11 @@
     'category': 'Sales',
     'summary': 'API for creating and retrieving different odoo business operations',
     'description': 'This module provides an API for creating and retrieving sales orders, payment, etc',
-    'depends': ['base', 'sale_management'],
-    'data': [],
+    'depends': ['base', 'sale_management', 'stock'],
+    'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron.xml',
+    ],
     'installable': True,
     'application': True,
 }
@@ -1,19 +1,82 @@
-from odoo import http
+import odoo
+from odoo import api, http
 from odoo.http import request
-import json
+import hashlib
 import logging
+from collections import defaultdict
+from datetime import timedelta
 from odoo.addons.eha_auth.controllers.helpers import validate_token, validate_secret_key, invalid_response, valid_response
 import werkzeug.wrappers
 from odoo import fields
 from odoo.exceptions import ValidationError
 
+from ..models.stock_quant import availability_cache
+from ..tools import metrics, payload
+
 
 logging.basicConfig(level=logging.INFO)
 _logger = logging.getLogger(__name__)
 
+# keyset pagination of the catalog endpoints
+DEFAULT_PAGE_LIMIT = 500
+MAX_PAGE_LIMIT = 2000
+
+# fields returned by /api/get-product when the payload does not select any,
+# 'sale_price' is kept as the public name of list_price for existing clients
+PRODUCT_DEFAULT_FIELDS = ['id', 'name', 'sale_price']
+PRODUCT_FIELD_ALIASES = {'sale_price': 'list_price'}
+
+# rows read per batch by the NDJSON exports
+EXPORT_BATCH_SIZE = 1000
+MAX_EXPORT_BATCH_SIZE = 5000
+EXPORT_ENTITIES = {'products': 'product.product', 'contacts': 'res.partner', 'sales_orders': 'sale.order'}
+
+# pages of the contact and user search
+SEARCH_PAGE_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# sales order values returned by the get and list operations
+SALE_ORDER_FIELDS = ['name', 'partner_id', 'user_id', 'date_order', 'state', 'amount_total']
+SALE_ORDER_LINE_FIELDS = ['order_id', 'product_id', 'product_uom_qty', 'price_unit']
+
+'''
+Add the skip context to avoid;  
+Journal Entry Draft Entry PBNK1/2023/00002 is not valid. 
+In order to proceed, the journal items must include one and only
+one outstanding payments/receipts account.
+'''
+PAYMENT_SKIP_CONTEXT = {
+    'skip_invoice_sync':True,
+    'skip_invoice_line_sync':True,
+    'skip_account_move_synchronization':True,
+    'check_move_validity':False,
+}
+
+# moves the batch invoice validation registers payments for, unless already paid
+PAYABLE_MOVE_TYPES = ('out_invoice', 'out_receipt')
+PAID_PAYMENT_STATES = ('paid', 'in_payment', 'reversed')
+
+# groupings and default period of the sales summary
+SALES_SUMMARY_GROUP_BY = ['day', 'user', 'branch', 'product']
+SALES_SUMMARY_DEFAULT_GROUP_BY = ['user', 'day']
+SALES_SUMMARY_DAYS = 30
+
+# the returned sync watermark is moved back by this many seconds so records
+# written by transactions still running during the sync are sent again
+SYNC_WATERMARK_OVERLAP = 60
+# records whose served values are partly stored on another record, e.g the
+# product name and price on its template, a delta sync also looks at the
+# write_date of that record: model: many2one to the record
+SYNC_RELATED_RECORDS = {
+    'product.product': 'product_tmpl_id',
+    'res.users': 'partner_id',
+}
+
 class SalesManController(http.Controller):
 
     @http.route('/api/v1/invoice-validation', type='json', auth='user', methods=['POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def validate_invoice_api(self, **kwargs):
         
         '''url = "http://localhost:8069/api/v1/invoice-validation"
@@ -23,12 +86,28 @@ class SalesManController(http.Controller):
             "invoice_id": 2, # 
             "is_register_payment": True or False, # 
             "journal_id": Null or Not Null, Not null if is_register_payment is True# 
+            "idempotency_key": "3f1c9a..." or Null, # a retried key replays the first response
+        }
+        batch payload, validates many invoices in one call:
+        payload = {
+            "invoice_numbers": ["INV/2024/00001", ...],
+            "invoice_ids": [2, 3, ...],
+            "is_register_payment": True or False,
+            "journal_id": Null or Not Null,
+            "idempotency_key": "3f1c9a..." or Null,
         }'''
-        data = json.loads(request.httprequest.data)
-        invoice_number = data.get('invoice_number')
+        data = payload.get_payload()
+        if data.get('invoice_numbers') or data.get('invoice_ids'):
+            metrics.annotate(operation='batch')
+            return self._run_idempotent(data, 'invoice_validation_batch', self._validate_invoices_batch)
+        return self._run_idempotent(data, 'invoice_validation', self._validate_invoice)
+
+    def _validate_invoice(self, data):
+        '''where data is equal to the sent payload of /api/v1/invoice-validation'''
+        invoice_number = data.get_str('invoice_number')
         invoice_id = data.get('invoice_id')
         journal_id = data.get('journal_id')
-        is_register_payment = data.get('is_register_payment')
+        is_register_payment = data.get_bool('is_register_payment')
         if not invoice_number or not invoice_id:
             return invalid_response(
                 "missing_parameter",
@@ -45,15 +124,14 @@ class SalesManController(http.Controller):
                     " [journal_id]",
                     200,
                 )
-            journal = request.env['account.journal'].search([('id', '=', int(journal_id))], limit=1)
-            if not journal:
+            journalid = self._get_payment_journal(journal_id)
+            if not journalid:
                 return invalid_response(
                     "missing_parameter",
                     "Provide Journal id does not exist in the database"
                     " [journal_id]",
                     200,
                 )
-            journalid = journal.id
         inv = request.env['account.move'].sudo().search([
             '|', ('name', '=', invoice_number), 
             ('id', '=', invoice_id)])
@@ -61,7 +139,6 @@ class SalesManController(http.Controller):
             if inv.state == "draft":
                 inv.action_post()
             if is_register_payment:
-                journalid = request.env['account.journal'].sudo().browse([8])
                 self.validate_invoice_and_post_journal(journalid, inv)
             return {
                 'success': True, 
@@ -75,143 +152,204 @@ class SalesManController(http.Controller):
                     }
             
     @http.route('/api/get-product', type='json', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def get_products(self, **kwargs):
         '''
         {
-            'product_id': 1 or null
+            'product_id': 1 or null,
+            'limit': 500 or null, # page size, defaults to 500 and capped at 2000
+            'after_id': 0 or null, # next_cursor of the previous page
+            'fields': ['id', 'name', 'sale_price'] or null, # product fields to return
+            'updated_since': '2024-05-01 08:00:00' or null, # watermark of the previous sync
+            'if_none_match': 'etag of the previous response' or null, # or the If-None-Match header
         }
-        if product id, returns the specific product by id else returns all products
+        if product id, returns the specific product by id else returns the products
+        page by page ordered by id, next_cursor is null on the last page.
+        if updated_since, only the products written after it are returned, the first
+        page also carries the archived or deleted ids and the new watermark
         '''
-        try:
-            data = json.loads(request.httprequest.data) # kwargs
-            product_id = data.get('product_id')
-            if product_id and type(product_id) != int:
-                return invalid_response(
-                    "Product id",
-                    "Product ID provided must be an integer"
-                    "[product_id]",
-                    400,
-                )
-            domain = [('id', '=', product_id)] if product_id else []
-            products = request.env['product.product'].search(domain)
-            if products:
-                data = []
-                for prd in products:
-                    data.append({
-                        'id': prd.id, 'name': prd.name, 'sale_price': prd.list_price
-                    })
-                return {
-                    'success': True, 
-                    'data':data
-                    }
-            else:
-                return {
-                    'success': False, 
-                    'message': 'No product found'}   
-        
-        except Exception as e:
+        data = payload.get_payload()
+        product_id = data.get_int('product_id')
+        limit, after_id = self._get_page_params(data)
+        field_names = self._get_product_fields(data.get('fields'))
+        updated_since = self._get_updated_since(data)
+        domain = [('id', '=', product_id)] if product_id else []
+        domain += self._branch_domain(request.env['product.product'])
+        if updated_since:
+            domain += self._get_updated_domain(request.env['product.product'], updated_since)
+            etag = None
+        else:
+            # the product names and prices are stored on their templates
+            etag, not_modified = self._check_etag(
+                data, request.env['product.product'], domain,
+                extra=[(request.env['product.template'], self._get_template_domain(domain))])
+            if not_modified:
+                return not_modified
+        products, next_cursor = self._search_read_page(
+            request.env['product.product'], domain,
+            [PRODUCT_FIELD_ALIASES.get(name, name) for name in field_names],
+            limit, after_id)
+        # a page after the last one is empty rather than an error
+        if products or updated_since or after_id:
+            result = {
+                'success': True, 
+                'data': [{
+                    name: prd[PRODUCT_FIELD_ALIASES.get(name, name)] for name in field_names
+                    } for prd in products],
+                'next_cursor': next_cursor,
+                'etag': etag,
+                }
+            if updated_since and not after_id:
+                result.update(self._get_sync_changes(request.env['product.product'], updated_since))
+            return result
+        else:
             return {
-                    'success': False, 
-                    'message': str(e)}
-            
+                'success': False, 
+                'message': 'No product found'}
+
     @http.route('/api/get-product-availability', type='json', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def get_product_availability(self, **kwargs):
         '''
         {
             'product_id': 1, compulsory,
             'requesting_qty': 2, # pass the requesting quantity
+            'strict': False, # True bypasses the short lived availability cache
         }
-        if product id, returns the specific product quantities based on the user company warehouse
+        if product id, returns the specific product quantities in the warehouses of the user branches
+
+        batch mode, checks many products in one call:
+        {
+            'lines': [{'product_id': 1, 'requesting_qty': 2}, ...],
+            'warehouse_ids': [1, 2] or null, # defaults to the warehouses of the user branches
+            'strict': False,
+        }
+        returns the available and short quantities of every line
         '''
-        try:
-            data = json.loads(request.httprequest.data) # kwargs
-            product_id = data.get('product_id')
-            qty = data.get('requesting_qty')
-            if product_id and type(product_id) != int:
-                return invalid_response(
-                    "Product id",
-                    "Product ID provided must be an integer"
-                    "[product_id]",
-                    400,
-                )
-            domain = [('active', '=', True),('id', '=', product_id)]
-            product = request.env['product.product'].search(domain, limit=1)
-            if product:
-                warehouse_domain = [('company_id', '=', request.env.user.company_id.id)]
-                warehouse_location_id = request.env['stock.warehouse'].search(warehouse_domain, limit=1)
-                stock_location_id = warehouse_location_id.lot_stock_id
-                # should_bypass_reservation : False
-                if product.detailed_type in ['product']:
-                    total_availability = request.env['stock.quant'].sudo()._get_available_quantity(product, stock_location_id, allow_negative=False) or 0.0
-                    product_qty = float(qty) if qty else 0
-                    if product_qty > total_availability:
-                        return {
-                            "success": False,
-                            "data": {'total_quantity': total_availability},
-                            "message": f"Selected product quantity ({product_qty}) is higher than the Available Quantity. Available quantity is {total_availability}", 
-                            }
-                    else:
-                        return {
-                            "status": True,
-                            "message": "The requesting quantity of Product is available", 
-						}
+        data = payload.get_payload()
+        if data.get('lines'):
+            metrics.annotate(operation='batch')
+            return self._get_batch_availability(data)
+        product_id = data.get_int('product_id')
+        qty = data.get('requesting_qty')
+        domain = [('active', '=', True),('id', '=', product_id)] + self._branch_domain(request.env['product.product'])
+        product = request.env['product.product'].search(domain, limit=1)
+        if product:
+            warehouses = self._get_user_warehouses()
+            # should_bypass_reservation : False
+            if product.detailed_type in ['product']:
+                quantities = request.env['stock.quant'].sudo()._salesman_get_available_quantities(
+                    product, warehouses, use_cache=not data.get_bool('strict'))
+                total_availability = sum(quantities.get((product.id, wh.id), 0.0) for wh in warehouses)
+                product_qty = float(qty) if qty else 0
+                if product_qty > total_availability:
+                    return {
+                        "success": False,
+                        "data": {'total_quantity': total_availability},
+                        "message": f"Selected product quantity ({product_qty}) is higher than the Available Quantity. Available quantity is {total_availability}", 
+                        }
                 else:
                     return {
-						"status": False,
-						"message": "Product selected for check must be a storable product and not service", 
-						}
+                        "status": True,
+                        "message": "The requesting quantity of Product is available", 
+                        }
             else:
                 return {
-                    'success': False, 
-                    'message': 'No product found'}   
-        
-        except Exception as e:
-            return {
-                    'success': False, 
-                    'message': str(e)
+                    "status": False,
+                    "message": "Product selected for check must be a storable product and not service", 
                     }
-            
+        else:
+            return {
+                'success': False, 
+                'message': 'No product found'}
+
+    @http.route('/api/v1/pricing', type='json', auth='user', methods=['POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
+    def get_pricing(self, **kwargs):
+        '''
+        quotes a cart in one call with the customer pricelist, taxes and discounts:
+        {
+            'partner_id': 1, # the pricelist and fiscal position of the customer
+            'pricelist_id': 1, # optional, overrides the customer pricelist
+            'lines': [{'product_id': 1, 'product_uom_qty': 2}, ...],
+            'strict': False, # True bypasses the short lived pricing cache
+        }
+        returns the price_unit, discount, tax_ids and totals of every line
+        '''
+        data = payload.get_payload()
+        return self._get_batch_prices(data)
+
+    @http.route('/api/v1/customer-statement', type='json', auth='user', methods=['GET', 'POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
+    def get_customer_statements(self, **kwargs):
+        '''
+        {
+            'partner_ids': [1, 2, ...], # or 'partner_id': 1
+            'strict': False, # True bypasses the statement cache
+        }
+        returns what every customer owes: the receivable due split in aging
+        buckets of days past due (0_30, 31_60, 61_90, 90_plus) and the open
+        invoices, computed for all the customers at once
+        '''
+        data = payload.get_payload()
+        partner_ids = data.get_int_list('partner_ids') or [data.get_int('partner_id', required=True)]
+        partners = request.env['res.partner'].search(
+            [('id', 'in', partner_ids)] + self._branch_domain(request.env['res.partner']))
+        if not partners:
+            return {
+                'success': False,
+                'message': 'No customer found'}
+        statements = request.env['account.move.line']._salesman_get_statements(
+            partners, use_cache=not data.get_bool('strict'))
+        return {
+            'success': True,
+            'data': [statements[partner_id] for partner_id in partner_ids if partner_id in statements],
+            }
+
     @http.route('/api/get-branch', type='json', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def get_branch(self, **kwargs):
         '''
         {
-            'branch_id': 1 or null
+            'branch_id': 1 or null,
+            'if_none_match': 'etag of the previous response' or null, # or the If-None-Match header
         }
-        if product id, returns the specific product by id else returns all products
+        if branch id, returns the specific branch by id else returns the branches of the user
         '''
-        try:
-            data = json.loads(request.httprequest.data) # kwargs
-            branch_id = data.get('branch_id')
-            if branch_id and type(branch_id) != int:
-                return invalid_response(
-                    "branch id",
-                    "branch ID provided must be an integer"
-                    "[branch_id]",
-                    400,
-                )
-            domain = [('id', '=', branch_id)] if branch_id else []
-            branch = request.env['multi.branch'].search(domain)
-            if branch:
-                data = []
-                for prd in branch:
-                    data.append({
-                        'id': prd.id, 'name': prd.name
-                    })
-                return {
-                    'success': True, 
-                    'data':data
-                    }
-            else:
-                return {
-                    'success': False, 
-                    'message': 'No branch found'}   
-        
-        except Exception as e:
+        data = payload.get_payload()
+        branch_id = data.get_int('branch_id')
+        domain = [('id', '=', branch_id)] if branch_id else []
+        branch_ids, _warehouses = self._get_branch_scope()
+        if branch_ids is not None:
+            domain.append(('id', 'in', branch_ids))
+        etag, not_modified = self._check_etag(data, request.env['multi.branch'], domain)
+        if not_modified:
+            return not_modified
+        branch = request.env['multi.branch'].search(domain)
+        if branch:
+            data = []
+            for prd in branch:
+                data.append({
+                    'id': prd.id, 'name': prd.name
+                })
             return {
-                    'success': False, 
-                    'message': str(e)}
-            
+                'success': True, 
+                'data':data,
+                'etag': etag,
+                }
+        else:
+            return {
+                'success': False, 
+                'message': 'No branch found'}
+
     @http.route('/api/contact-operation', type='json', auth='user', methods=['GET', 'POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def get_contacts(self, **kwargs):
         '''
         {
@@ -224,137 +362,651 @@ class SalesManController(http.Controller):
             'address2': 'No. 46 Maduka Sopulu Street'
             'phone': '09092998888',
             'email': 'maduka@gmail.com',
+            'updated_since': '2024-05-01 08:00:00' or null, # watermark of the previous sync
+            'q': 'mad' or null, # searches the name, phone and email, best matches first
+            'limit': 20 or null, 'offset': 0 or null, # page of the q search
         }
         if contact id, returns the specific contact by id else returns all contacts
+
+        bulk upsert, creates or updates many contacts in one call:
+        {
+            'contacts': [{'contact_name': ..., 'address1': ..., 'address2': ..., 'phone': ..., 'email': ...}, ...]
+        }
+        contacts are matched to the existing ones by phone (digits only) or email
+        (case insensitive), the contacts of the batch sharing one are collapsed,
+        every contact gets back its resolved id
+        if updated_since, only returns the contacts written after it along with
+        the archived or deleted ids and the new watermark
         '''
-        try:
-            data = json.loads(request.httprequest.data) # kwargs
-            contact_id = data.get('contact_id')
-            address1 = data.get('address1')
-            address2 = data.get('address2')
-            phone = data.get('phone')
-            email = data.get('email')
-            contact_name = data.get('contact_name')
-            to_create_contact = data.get('to_create_contact')
-            if contact_id and type(contact_id) != int:
-                return invalid_response(
-                    "contact id",
-                    "contact ID provided must be an integer"
-                    "[contact_id]",
-                    400,
-                )
-            domain = ['|', ('id', '=', contact_id), ('name', '=', contact_name)] if contact_id or contact_name else []
-            contact = request.env['res.partner'].search(domain)
-            address = address1 or address2
-            if (not contact) and to_create_contact:
-                if not contact_name or not address or not phone or not email:
-                    return {
-                    'success': False, 
-                    'message': 'Please provide the following fields; contact name, address, phone and email'
-                    }
-                contact_vals = {
-                    'name': contact_name, 
-                    'street': address1, 
-                    'street2': address2,
-                    'phone': phone,
-                    'email': email,
-                }
-                contact = request.env['res.partner'].create(contact_vals)
-            if contact:
-                data = []
-                for cnt in contact:
-                    data.append({
-                        'id': cnt.id, 
-                        'contact_name': cnt.name or None, 
-                        'address1': cnt.street or None, 
-                        'address2': cnt.street2 or None,
-                        'phone': cnt.phone or None,
-                        'email': cnt.email or None,
-                    })
+        data = payload.get_payload()
+        if data.get('contacts'):
+            metrics.annotate(operation='upsert')
+            return self._upsert_contacts(data)
+        contact_id = data.get_int('contact_id')
+        address1 = data.get('address1')
+        address2 = data.get('address2')
+        phone = data.get('phone')
+        email = data.get('email')
+        contact_name = data.get_str('contact_name')
+        to_create_contact = data.get_bool('to_create_contact')
+        branch_domain = self._branch_domain(request.env['res.partner'])
+        if data.get_str('q'):
+            return self._search_records(request.env['res.partner'], data, self._serialize_contact, branch_domain)
+        updated_since = self._get_updated_since(data)
+        if updated_since and not (contact_id or contact_name):
+            return self._get_delta_records(
+                request.env['res.partner'], updated_since, self._serialize_contact, branch_domain)
+        domain = ['|', ('id', '=', contact_id), ('name', '=', contact_name)] if contact_id or contact_name else []
+        domain += branch_domain
+        contact = request.env['res.partner'].search(domain)
+        address = address1 or address2
+        if (not contact) and to_create_contact:
+            if not contact_name or not address or not phone or not email:
                 return {
-                    'success': True, 
-                    'data':data
-                    }
-            else:
-                return {
-                    'success': False, 
-                    'message': 'No contact found on the system'}   
-        
-        except Exception as e:
+                'success': False, 
+                'message': 'Please provide the following fields; contact name, address, phone and email'
+                }
+            contact_vals = {
+                'name': contact_name, 
+                'street': address1, 
+                'street2': address2,
+                'phone': phone,
+                'email': email,
+            }
+            contact = request.env['res.partner'].create(contact_vals)
+        if contact:
+            data = []
+            for cnt in contact:
+                data.append(self._serialize_contact(cnt))
             return {
-                    'success': False, 
-                    'message': str(e)} 
-            
+                'success': True, 
+                'data':data
+                }
+        else:
+            return {
+                'success': False, 
+                'message': 'No contact found on the system'}
+
+    @http.route('/api/v1/nearby-contacts', type='json', auth='user', methods=['GET', 'POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
+    def get_nearby_contacts(self, **kwargs):
+        '''
+        {
+            'latitude': 6.5244, 'longitude': 3.3792, # position of the salesman
+            'limit': 20 or null, # number of contacts, capped at 100
+            'radius_km': 5 or null, # only the contacts within this distance
+        }
+        returns the geolocated contacts nearest to the position, closest first,
+        with their distance in km
+        '''
+        data = payload.get_payload()
+        latitude, longitude = data.get('latitude'), data.get('longitude')
+        radius_km = data.get('radius_km')
+        limit = data.get('limit') or SEARCH_PAGE_LIMIT
+        if any(type(value) not in (int, float) for value in (latitude, longitude)) \
+                or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValidationError("latitude and longitude provided must be numbers in degrees")
+        if (radius_km is not None and (type(radius_km) not in (int, float) or radius_km <= 0)) \
+                or type(limit) != int or limit < 0:
+            raise ValidationError("radius_km provided must be a positive number and limit a positive integer")
+        contacts = request.env['res.partner']._salesman_nearby(
+            latitude, longitude, limit=min(limit, MAX_SEARCH_LIMIT), radius_km=radius_km,
+            domain=self._branch_domain(request.env['res.partner']))
+        return {
+            'success': True,
+            'data': [dict(
+                self._serialize_contact(cnt),
+                latitude=cnt.partner_latitude,
+                longitude=cnt.partner_longitude,
+                distance_km=round(distance, 3),
+            ) for distance, cnt in contacts],
+            }
+
     @http.route('/api/get-users', type='json', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def get_users(self, **kwargs):
         '''
         {
             'user_id': 1 or null
             'user_name': Moses Abraham or null
+            'updated_since': '2024-05-01 08:00:00' or null, # watermark of the previous sync
+            'q': 'mad' or null, # searches the name, login, phone and email, best matches first
+            'limit': 20 or null, 'offset': 0 or null, # page of the q search
+            'if_none_match': 'etag of the previous response' or null, # or the If-None-Match header
         }
         if user id or user name, returns the specific contact by id  or name else returns all contacts
+        if updated_since, only returns the users written after it along with
+        the archived or deleted ids and the new watermark
         '''
-        try:
-            data = json.loads(request.httprequest.data) # kwargs
-            user_id = data.get('user_id')
-            user_name = data.get('user_name')
-            if user_id and type(user_id) != int:
-                return invalid_response(
-                    "user id",
-                    "user ID provided must be an integer"
-                    "[user_id]",
-                    400,
-                )
-            domain = ['|', ('id', '=', user_id), ('name', '=', user_name)] if user_id or user_name else []
-            users = request.env['res.users'].sudo().search(domain)
-            if users:
-                data = []
-                for usr in users:
-                    data.append({
-                        'id': usr.id, 
-                        'user_name': usr.name or None,
-                    })
-                return {
-                    'success': True, 
-                    'data':data
-                    }
-            else:
-                return {
-                    'success': False, 
-                    'message': 'No user found on the system'}   
-        
-        except Exception as e:
+        data = payload.get_payload()
+        user_id = data.get_int('user_id')
+        user_name = data.get_str('user_name')
+        if data.get_str('q'):
+            return self._search_records(request.env['res.users'].sudo(), data, self._serialize_user)
+        updated_since = self._get_updated_since(data)
+        if updated_since and not (user_id or user_name):
+            return self._get_delta_records(
+                request.env['res.users'].sudo(), updated_since, self._serialize_user)
+        domain = ['|', ('id', '=', user_id), ('name', '=', user_name)] if user_id or user_name else []
+        # the user names are stored on their partners
+        etag, not_modified = self._check_etag(
+            data, request.env['res.users'].sudo(), domain,
+            extra=[(request.env['res.partner'].sudo(), [('user_ids', '!=', False)])])
+        if not_modified:
+            return not_modified
+        users = request.env['res.users'].sudo().search(domain)
+        if users:
+            data = []
+            for usr in users:
+                data.append(self._serialize_user(usr))
             return {
-                    'success': False, 
-                    'message': str(e)} 
-        
+                'success': True, 
+                'data':data,
+                'etag': etag,
+                }
+        else:
+            return {
+                'success': False, 
+                'message': 'No user found on the system'}
+
+    @http.route('/api/v1/export/<string:entity>', type='http', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    def export_records(self, entity, **kwargs):
+        '''url = "http://localhost:8069/api/v1/export/products?fields=id,name,sale_price"
+        entity: products, contacts or sales_orders
+        query parameters, all optional:
+            fields: comma separated product fields (products only)
+            updated_since: 2024-05-01 08:00:00, only exports the records written after it
+            batch_size: rows read per query, defaults to 1000
+        streams the records as newline delimited JSON (one record per line) ordered
+        by id, they are read batch by batch so the memory used stays flat
+        '''
+        if entity not in EXPORT_ENTITIES:
+            return invalid_response(
+                "entity",
+                f"entity must be one of {', '.join(EXPORT_ENTITIES)}",
+                404,
+            )
+        try:
+            batch_size = min(max(int(kwargs.get('batch_size') or EXPORT_BATCH_SIZE), 1), MAX_EXPORT_BATCH_SIZE)
+            field_names = self._get_product_fields(
+                [name.strip() for name in kwargs['fields'].split(',')] if kwargs.get('fields') else None)
+            updated_since = self._get_updated_since(kwargs)
+        except (ValueError, ValidationError) as e:
+            return invalid_response("invalid_parameter", str(e), 400)
+        model = request.env[EXPORT_ENTITIES[entity]]
+        domain = self._get_updated_domain(model, updated_since) if updated_since else []
+        if entity == 'sales_orders':
+            domain += self._order_domain()
+        else:
+            domain += self._branch_domain(model)
+        # the response is streamed once the request is over, the rows are read
+        # through a cursor of their own which also keeps the batches consistent
+        dbname, uid, context = request.env.cr.dbname, request.env.uid, dict(request.env.context)
+
+        def generate():
+            with odoo.registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                after_id = 0
+                while True:
+                    rows = self._read_export_batch(
+                        env, entity, domain + [('id', '>', after_id)], field_names, batch_size)
+                    if not rows:
+                        break
+                    yield b''.join(payload.dumps(row) + b'\n' for row in rows)
+                    after_id = rows[-1]['id']
+                    env.invalidate_all()
+                    if len(rows) < batch_size:
+                        break
+
+        return werkzeug.wrappers.Response(
+            generate(),
+            status=200,
+            content_type="application/x-ndjson; charset=utf-8",
+            headers=[("Cache-Control", "no-store")],
+            direct_passthrough=True,
+        )
+
+    def _read_export_batch(self, env, entity, domain, field_names, batch_size):
+        '''reads the next batch of rows of an export, ordered by id'''
+        if entity == 'products':
+            products = env['product.product'].search_read(
+                domain, [PRODUCT_FIELD_ALIASES.get(name, name) for name in field_names],
+                limit=batch_size, order='id')
+            return [{name: prd[PRODUCT_FIELD_ALIASES.get(name, name)] for name in field_names} for prd in products]
+        if entity == 'contacts':
+            contacts = env['res.partner'].search(domain, limit=batch_size, order='id')
+            return [self._serialize_contact(cnt) for cnt in contacts]
+        orders = env['sale.order'].sudo().search_read(
+            domain, SALE_ORDER_FIELDS, limit=batch_size, order='id', load=None)
+        return self._serialize_sales_orders(orders, env)
+
+    @http.route('/api/v1/sync-bundle', type='http', auth='user', methods=['GET'], csrf=False)
+    @metrics.instrument
+    def get_sync_bundle(self, **kwargs):
+        '''url = "http://localhost:8069/api/v1/sync-bundle"
+        downloads the offline snapshot of the products, pricelists, branches,
+        contacts and users of the salesman in the current company, built ahead
+        by a cron as gzip (or zstd) compressed JSON, see the X-Bundle-* headers
+        supports If-None-Match (304) and Range requests to resume a download
+        '''
+        Bundle = request.env['salesman.sync.bundle'].sudo()
+        branch_ids, _warehouses = self._get_branch_scope()
+        bundle = Bundle.search([
+            ('company_id', '=', request.env.company.id),
+            ('scope_key', '=', Bundle._salesman_scope_key(branch_ids)),
+        ], limit=1)
+        if not bundle.attachment_id:
+            return invalid_response(
+                "sync bundle",
+                "No sync bundle has been built for the branches of this user yet, retry later",
+                404,
+            )
+        data = bundle.attachment_id.raw
+        response = werkzeug.wrappers.Response(
+            data,
+            status=200,
+            content_type=bundle.attachment_id.mimetype,
+            headers=[
+                ("Cache-Control", "private, no-cache"),
+                ("Content-Disposition", f'attachment; filename="{bundle.attachment_id.name}"'),
+                ("X-Bundle-Version", str(bundle.version)),
+                ("X-Bundle-Encoding", bundle.encoding),
+            ],
+        )
+        response.set_etag(bundle.checksum)
+        response.last_modified = bundle.built_at
+        return response.make_conditional(request.httprequest, accept_ranges=True, complete_length=len(data))
+
+    @http.route('/api/v1/metrics', type='http', auth='user', methods=['GET'], csrf=False)
+    def get_metrics(self, **kwargs):
+        '''url = "http://localhost:8069/api/v1/metrics"
+        returns the performance metrics of the API routes of this worker in the
+        Prometheus text format: p50/p95/p99 of the wall time, SQL queries, SQL time,
+        payload size and result rows per route and operation, administrators only
+        '''
+        if not request.env.user.has_group('base.group_system'):
+            return invalid_response(
+                "access_denied",
+                "Only administrators can read the API metrics",
+                403,
+            )
+        cache_stats = availability_cache.stats()
+        body = metrics.render_prometheus(extra_counters=[
+            ('salesman_availability_cache_hits_total', 'Availability cache hits', cache_stats['hits']),
+            ('salesman_availability_cache_misses_total', 'Availability cache misses', cache_stats['misses']),
+        ])
+        return werkzeug.wrappers.Response(
+            status=200,
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+            headers=[("Cache-Control", "no-store")],
+            response=body,
+        )
+
     @http.route('/api/sales_order/operation', type='json', auth='user', methods=['POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
     def handle_sales_operations(self, **kwargs):
         ''''''
+        data = payload.get_payload()
+        _logger.debug("Raw request data: %s", data)
+        metrics.annotate(operation=data.get('operation'))
+        if data.get('operation') == 'create':
+            return self._run_idempotent(data, 'create', self._create_sales_order)
+        elif data.get('operation') == 'bulk_create':
+            return self._run_idempotent(data, 'bulk_create', self._bulk_create_sales_orders)
+        elif data.get('operation') == 'update':
+            return self._update_sales_order(data)
+        elif data.get('operation') == 'get':
+            return self._get_sales_order(data)
+        elif data.get('operation') == 'list':
+            return self._list_sales_orders(data)
+        elif data.get('operation') == 'quote':
+            return self._quote_sales_order(data)
+        else:
+            return {'success': False, 'message': 'Ensure that the operation data contains create, bulk_create, update, get, list or quote'}
+
+    @http.route('/api/v1/sales-summary', type='json', auth='user', methods=['GET', 'POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
+    def get_sales_summary(self, **kwargs):
+        '''
+        {
+            'date_from': '2024-05-01' or null, # defaults to 30 days ago
+            'date_to': '2024-05-31' or null, # defaults to today
+            'group_by': ['user', 'day'] or null, # any of day, user, branch and product
+            'user_ids': [1, 2] or null, 'branch_ids': [1] or null, 'product_ids': [1] or null,
+        }
+        returns the order count, quantity, untaxed and total amounts (company
+        currency) of the confirmed orders per group, salesmen who do not see all
+        the orders only get their own figures
+        '''
+        data = payload.get_payload()
+        group_by = data.get('group_by') or SALES_SUMMARY_DEFAULT_GROUP_BY
+        if not isinstance(group_by, list) or not set(group_by) <= set(SALES_SUMMARY_GROUP_BY):
+            raise ValidationError(f"group_by provided must be a list of {', '.join(SALES_SUMMARY_GROUP_BY)}")
+        try:
+            today = fields.Date.context_today(request.env['res.users'].with_context(tz='UTC'))
+            date_to = fields.Date.to_date(data.get('date_to')) or today
+            date_from = fields.Date.to_date(data.get('date_from')) or date_to - timedelta(days=SALES_SUMMARY_DAYS)
+        except (TypeError, ValueError):
+            raise ValidationError("date_from and date_to provided must be dates formatted as YYYY-MM-DD")
+        if date_from > date_to:
+            raise ValidationError("date_from provided must be before date_to")
+        user_ids = data.get_int_list('user_ids')
+        if not request.env.user.has_group('sales_team.group_sale_salesman_all_leads'):
+            user_ids = [request.env.uid]
+        branch_ids = data.get_int_list('branch_ids')
+        scope_branch_ids, _warehouses = self._get_branch_scope()
+        if scope_branch_ids is not None and 'branch_id' in request.env['sale.order']._fields:
+            branch_ids = [branch_id for branch_id in branch_ids if branch_id in scope_branch_ids] or scope_branch_ids
+        rows = request.env['salesman.sales.rollup'].sudo()._salesman_summary(
+            date_from, date_to, list(dict.fromkeys(group_by)),
+            user_ids=user_ids,
+            branch_ids=branch_ids,
+            product_ids=data.get_int_list('product_ids'))
+        return {
+            'success': True,
+            'date_from': date_from,
+            'date_to': date_to,
+            'data': rows,
+            }
+
+    @http.route('/api/sales_order/job-status', type='json', auth='user', methods=['GET', 'POST'], csrf=False)
+    @metrics.instrument
+    @payload.handle_errors
+    def get_sales_order_job_status(self, **kwargs):
+        '''
+        {
+            'job_ids': [1, 2], # ids returned by an async create or bulk_create
+        }
+        returns the state of the queued orders of the user, with the sales order
+        and invoice once processed or the error message when it failed
+        '''
+        data = payload.get_payload()
+        job_ids = data.get_int_list('job_ids', required=True)
+        jobs = request.env['salesman.order.job'].sudo().search(
+            [('id', 'in', job_ids), ('user_id', '=', request.env.uid)])
+        if jobs:
+            states = jobs.mapped('state')
+            return {
+                'success': True,
+                'data': jobs._salesman_status(),
+                'progress': {state: states.count(state) for state in ('pending', 'done', 'failed')},
+                }
+        else:
+            return {
+                'success': False,
+                'message': 'No job found'}
+
+    def _get_page_params(self, data):
+        '''returns the (limit, after_id) keyset pagination parameters of the payload'''
+        limit = data.get('limit') or DEFAULT_PAGE_LIMIT
+        after_id = data.get('after_id') or 0
+        if type(limit) != int or type(after_id) != int or limit < 0 or after_id < 0:
+            raise ValidationError("limit and after_id provided must be positive integers")
+        return min(limit, MAX_PAGE_LIMIT), after_id
+
+    def _get_product_fields(self, field_names):
+        '''validates the product fields selected by the client'''
+        if not field_names:
+            return PRODUCT_DEFAULT_FIELDS
+        if not isinstance(field_names, list):
+            raise ValidationError("fields provided must be a list of product fields")
+        product_fields = request.env['product.product']._fields
+        unknown = [name for name in field_names if PRODUCT_FIELD_ALIASES.get(name, name) not in product_fields]
+        if unknown:
+            raise ValidationError(f"Unknown product fields: {', '.join(map(str, unknown))}")
+        return ['id'] + [name for name in field_names if name != 'id']
+
+    def _search_read_page(self, model, domain, field_names, limit, after_id, **read_kwargs):
+        '''reads one page of records ordered by id with a single search_read
+        returns the records and the cursor of the next page (None on the last page)
+        '''
+        records = model.search_read(
+            domain + [('id', '>', after_id)], field_names, limit=limit, order='id', **read_kwargs)
+        next_cursor = records[-1]['id'] if len(records) == limit else None
+        return records, next_cursor
+
+    def _serialize_contact(self, cnt):
+        return {
+            'id': cnt.id, 
+            'contact_name': cnt.name or None, 
+            'address1': cnt.street or None, 
+            'address2': cnt.street2 or None,
+            'phone': cnt.phone or None,
+            'email': cnt.email or None,
+        }
+
+    def _serialize_user(self, usr):
+        return {
+            'id': usr.id, 
+            'user_name': usr.name or None,
+        }
+
+    def _upsert_contacts(self, data):
+        contacts = data.get('contacts')
+        if not isinstance(contacts, list):
+            return invalid_response(
+                "contacts",
+                "contacts provided must be a list of contacts"
+                "[contacts]",
+                400,
+            )
+        results = request.env['res.partner']._salesman_upsert(
+            contacts, domain=self._branch_domain(request.env['res.partner']))
+        return {
+            'success': all(result['success'] for result in results),
+            'data': results,
+            }
+
+    def _search_records(self, model, data, serializer, domain=()):
+        '''returns one page of the records of model matching domain best matching the q search term'''
+        term = data.get_str('q', required=True)
+        limit = data.get('limit') or SEARCH_PAGE_LIMIT
+        offset = data.get('offset') or 0
+        if type(limit) != int or type(offset) != int or limit < 0 or offset < 0:
+            raise ValidationError("limit and offset provided must be positive integers")
+        limit = min(limit, MAX_SEARCH_LIMIT)
+        records = model._salesman_search(term, limit=limit, offset=offset, domain=domain)
+        return {
+            'success': True,
+            'data': [serializer(rec) for rec in records],
+            'next_offset': offset + limit if len(records) == limit else None,
+        }
+
+    def _check_etag(self, data, model, domain, extra=()):
+        '''computes the version of the records of model matching domain from their
+        count and latest write_date, one aggregate query per model, without reading them
+        returns the ETag and the 304 response to send when the client already has it
+        '''
+        versions = [model._name, {key: value for key, value in data.items() if key != 'if_none_match'}]
+        for version_model, version_domain in [(model, domain)] + list(extra):
+            group = version_model.read_group(version_domain, ['write_date:max'], [])[0]
+            versions += [group['__count'], group['write_date']]
+        etag = hashlib.md5(payload.dumps(versions, sort_keys=True)).hexdigest()
+        if_none_match = data.get('if_none_match') or request.httprequest.headers.get('If-None-Match')
+        if isinstance(if_none_match, str) and if_none_match.strip().replace('W/', '', 1).strip('"') == etag:
+            return etag, {'success': True, 'status_code': 304, 'etag': etag}
+        return etag, None
+
+    def _get_template_domain(self, domain):
+        '''translates a product.product domain to the templates of the matching products'''
+        return [
+            (f'product_variant_ids.{leaf[0]}',) + tuple(leaf[1:]) if isinstance(leaf, (list, tuple)) else leaf
+            for leaf in domain
+        ]
+
+    def _get_updated_since(self, data):
+        '''returns the updated_since watermark of the payload as a datetime or None'''
+        updated_since = data.get('updated_since')
+        if not updated_since:
+            return None
         try:
-            _logger.info("Raw request data: ")
-
-            data = json.loads(request.httprequest.data) # kwargs
-            _logger.info(data)
-            if data.get('operation') == 'create':
-                return self._create_sales_order(data)
-            elif data.get('operation') == 'update':
-                return self._update_sales_order(data)
-            elif data.get('operation') == 'get':
-                return self._get_sales_order(data)
+            return fields.Datetime.to_datetime(updated_since)
+        except (TypeError, ValueError):
+            raise ValidationError("updated_since provided must be a datetime formatted as YYYY-MM-DD HH:MM:SS")
+
+    def _get_updated_domain(self, model, updated_since):
+        '''returns the domain of the records of model written since the watermark,
+        directly or through the record holding part of their values'''
+        related = SYNC_RELATED_RECORDS.get(model._name)
+        if not related:
+            return [('write_date', '>', updated_since)]
+        return ['|', ('write_date', '>', updated_since), (f'{related}.write_date', '>', updated_since)]
+
+    def _get_sync_changes(self, model, updated_since):
+        '''returns the ids of model archived or deleted since the watermark
+        along with the watermark to send on the next sync
+        '''
+        watermark = fields.Datetime.subtract(fields.Datetime.now(), seconds=SYNC_WATERMARK_OVERLAP)
+        archived = model.with_context(active_test=False).search(
+            [('active', '=', False), ('write_date', '>', updated_since)])
+        deleted_ids = request.env['salesman.sync.tombstone']._get_deleted_ids(model._name, updated_since)
+        return {
+            'deleted_ids': archived.ids + deleted_ids,
+            'watermark': fields.Datetime.to_string(watermark),
+        }
+
+    def _get_delta_records(self, model, updated_since, serializer, domain=()):
+        '''returns the records of model matching domain written since the watermark'''
+        records = model.search(self._get_updated_domain(model, updated_since) + list(domain))
+        result = {
+            'success': True,
+            'data': [serializer(rec) for rec in records],
+        }
+        result.update(self._get_sync_changes(model, updated_since))
+        return result
+
+    def _get_batch_availability(self, data):
+        '''checks the requested quantities of many products against the stock of
+        the selected warehouses, every product is computed by the same grouped query
+        '''
+        lines = data.get('lines')
+        warehouse_ids = data.get_int_list('warehouse_ids')
+        if not isinstance(lines, list) or any(
+                not isinstance(line, dict) or type(line.get('product_id')) != int for line in lines):
+            return invalid_response(
+                "lines",
+                "lines provided must be a list of product_id and requesting_qty"
+                " with an integer product_id [lines]",
+                400,
+            )
+        branch_ids, warehouses = self._get_branch_scope()
+        if warehouse_ids:
+            if branch_ids is None:
+                # a user without branch checks any warehouse of the company
+                warehouses = request.env['stock.warehouse'].sudo().search(
+                    [('company_id', '=', request.env.company.id), ('id', 'in', warehouse_ids)])
             else:
-                return {'success': False, 'message': 'Ensure that the operation data contains create, update, or get'}   
-        
-        except Exception as e:
-            return {'error': str(e)}
-        
+                warehouses = warehouses.filtered(lambda wh: wh.id in warehouse_ids)
+        if not warehouses:
+            return {
+                'success': False, 
+                'message': 'No warehouse found'}
+        products = request.env['product.product'].search(
+            [('active', '=', True), ('id', 'in', list({line['product_id'] for line in lines}))]
+            + self._branch_domain(request.env['product.product']))
+        storable_products = products.filtered(lambda prd: prd.detailed_type == 'product')
+        quantities = request.env['stock.quant'].sudo()._salesman_get_available_quantities(
+            storable_products, warehouses, use_cache=not data.get_bool('strict'))
+        product_ids, storable_ids = set(products.ids), set(storable_products.ids)
+
+        result_lines = []
+        for line in lines:
+            product_id = line['product_id']
+            product_qty = float(line.get('requesting_qty') or 0)
+            result_line = {'product_id': product_id, 'requesting_qty': product_qty}
+            if product_id not in product_ids:
+                result_line.update(is_available=False, message='No product found')
+            elif product_id not in storable_ids:
+                result_line.update(
+                    is_available=False,
+                    message='Product selected for check must be a storable product and not service')
+            else:
+                per_warehouse = [{
+                    'warehouse_id': wh.id,
+                    'available_quantity': quantities.get((product_id, wh.id), 0.0),
+                    } for wh in warehouses]
+                total_availability = sum(wh['available_quantity'] for wh in per_warehouse)
+                result_line.update(
+                    is_available=product_qty <= total_availability,
+                    available_quantity=total_availability,
+                    short_quantity=max(product_qty - total_availability, 0.0),
+                    warehouses=per_warehouse)
+            result_lines.append(result_line)
+        all_available = all(line['is_available'] for line in result_lines)
+        return {
+            'success': all_available,
+            'data': result_lines,
+            'message': 'The requesting quantities of the products are available' if all_available
+                else 'Some of the requesting quantities are not available',
+        }
+
+    def _get_batch_prices(self, data):
+        '''prices the lines of the payload with the pricelist of the payload or of
+        the customer, every product is priced by the same pass over the rules
+        '''
+        lines = data.get_list('lines', required=True)
+        partner_id = data.get_int('partner_id')
+        pricelist_id = data.get_int('pricelist_id')
+        if any(type(line.get('product_id')) != int for line in lines):
+            raise ValidationError("product_id of every line provided must be an integer")
+        partner = request.env['res.partner']
+        if partner_id:
+            partner = partner.search([('id', '=', partner_id)] + self._branch_domain(partner), limit=1)
+            if not partner:
+                return {
+                    'success': False, 
+                    'message': 'No customer found'}
+        if pricelist_id:
+            pricelist = request.env['product.pricelist'].search([('id', '=', pricelist_id)], limit=1)
+        else:
+            pricelist = partner.property_product_pricelist
+        if not pricelist:
+            return {
+                'success': False, 
+                'message': 'No pricelist found, provide a customer or a pricelist'}
+        result_lines = pricelist._salesman_get_prices(
+            lines, partner=partner, use_cache=not data.get_bool('strict'),
+            product_domain=self._branch_domain(request.env['product.product']))
+        priced_lines = [line for line in result_lines if 'price_unit' in line]
+        currency = pricelist.currency_id
+        return {
+            'success': len(priced_lines) == len(result_lines),
+            'pricelist_id': pricelist.id,
+            'currency': currency.name,
+            'data': result_lines,
+            'amount_untaxed': currency.round(sum(line['price_subtotal'] for line in priced_lines)),
+            'amount_tax': currency.round(sum(line['price_tax'] for line in priced_lines)),
+            'amount_total': currency.round(sum(line['price_total'] for line in priced_lines)),
+        }
+
+    def _run_idempotent(self, data, operation, func):
+        '''calls func(data) once per idempotency_key of the payload, the retries
+        of a processed key get the stored response back without running func again
+        '''
+        idempotency_key = data.get('idempotency_key')
+        if not idempotency_key:
+            return func(data)
+        if not isinstance(idempotency_key, str) or len(idempotency_key) > 255:
+            return invalid_response(
+                "idempotency key",
+                "idempotency key provided must be a string of at most 255 characters"
+                "[idempotency_key]",
+                400,
+            )
+        return request.env['salesman.idempotency.key']._salesman_run(
+            idempotency_key, operation, lambda: func(data))
+
     def _create_sales_order(self, data):
         '''where data is equal to the sent payload'''
         partner_id = data.get('partner_id')
         order_lines = data.get('order_lines')
         company_id = data.get('company_id')
-        _logger.info(f"Data is {data}")
-        _logger.info(f".....Partner_id: {partner_id}, Order Lines: {order_lines} and Company ID: {company_id}.....")
+        _logger.debug(f".....Partner_id: {partner_id}, Order Lines: {order_lines} and Company ID: {company_id}.....")
         
         if not partner_id or not order_lines:
             return invalid_response(
@@ -363,86 +1015,371 @@ class SalesManController(http.Controller):
                 " [partner_id, order_lines]",
                 400,
             )
-        order_vals = {
-            'partner_id': partner_id,
-            'company_id': company_id,
-            'order_line': [(0, 0, line) for line in order_lines]
-        }
+        if data.get_bool('async'):
+            return self._enqueue_sales_orders([data])
+        order_vals = request.env['sale.order']._salesman_prepare_order_vals(data)
         order = request.env['sale.order'].sudo().create(order_vals)
         order.action_confirm()
         inv = order.sudo()._create_invoices()[0]
         return {
             'success': True, 
-            'data': {'so_id': order.id, 'so_id': order.name, 'invoice_id': inv.id}
+            'data': {'so_id': order.id, 'so_number': order.name, 'invoice_id': inv.id}
             } 
             
+    def _quote_sales_order(self, data):
+        '''checks a draft order before it is submitted, nothing is saved
+        data = {
+            'operation': 'quote',
+            'partner_id': 3,
+            'pricelist_id': 1 or null, # defaults to the customer pricelist
+            'order_lines': [{'product_id': 1, 'product_uom_qty': 2}, ...],
+            'strict': False, # True bypasses the pricing and availability caches
+        }
+        returns the prices, taxes and availability of every line, the order totals
+        and the errors that would block the order: unknown products, short stock
+        and a customer credit limit the order would exceed
+        '''
+        partner_id = data.get('partner_id')
+        order_lines = data.get('order_lines')
+        if not partner_id or not order_lines:
+            return invalid_response(
+                "missing_parameter",
+                "Missing required parameters"
+                " [partner_id, order_lines]",
+                400,
+            )
+        pricing = self._get_batch_prices(payload.Payload({
+            'partner_id': partner_id,
+            'pricelist_id': data.get('pricelist_id'),
+            'lines': order_lines,
+            'strict': data.get_bool('strict'),
+        }, data.env))
+        if 'data' not in pricing:
+            return pricing
+        result_lines = pricing['data']
+        errors = [
+            {'code': 'product_not_found', 'product_id': line['product_id'], 'message': line['message']}
+            for line in result_lines if 'message' in line
+        ]
+
+        # the quantities of a product ordered on several lines share its stock
+        requested = defaultdict(float)
+        for line in result_lines:
+            requested[line['product_id']] += line['product_uom_qty']
+        products = request.env['product.product'].browse(
+            [line['product_id'] for line in result_lines if 'price_unit' in line])
+        storable_products = products.filtered(lambda prd: prd.detailed_type == 'product')
+        warehouses = self._get_user_warehouses()
+        quantities = request.env['stock.quant'].sudo()._salesman_get_available_quantities(
+            storable_products, warehouses, use_cache=not data.get_bool('strict'))
+        available_quantities = {
+            product.id: sum(quantities.get((product.id, wh.id), 0.0) for wh in warehouses)
+            for product in storable_products
+        }
+        for product in storable_products:
+            available = available_quantities[product.id]
+            if requested[product.id] > available:
+                errors.append({
+                    'code': 'insufficient_stock',
+                    'product_id': product.id,
+                    'message': f"Requested quantity of {product.display_name} ({requested[product.id]}) "
+                               f"is higher than the available quantity ({available})",
+                })
+        storable_ids = set(storable_products.ids)
+        for line in result_lines:
+            if line['product_id'] in storable_ids:
+                available = available_quantities[line['product_id']]
+                line.update(
+                    available_quantity=available,
+                    is_available=requested[line['product_id']] <= available)
+            elif 'price_unit' in line:
+                line.update(is_available=True)
+
+        # the pricing already answered the customers out of the branches of the user
+        partner = request.env['res.partner'].search(
+            [('id', '=', partner_id)] + self._branch_domain(request.env['res.partner']),
+            limit=1).commercial_partner_id
+        company = request.env.company
+        credit = {'credit': partner.credit, 'credit_limit': partner.credit_limit}
+        if company.account_use_credit_limit and partner.credit_limit \
+                and partner.credit + pricing['amount_total'] > partner.credit_limit:
+            errors.append({
+                'code': 'credit_limit_exceeded',
+                'message': f"{partner.name} owes {partner.credit}, the order total of "
+                           f"{pricing['amount_total']} exceeds the credit limit of {partner.credit_limit}",
+            })
+        return {
+            'success': not errors,
+            'data': {
+                'partner_id': partner_id,
+                'pricelist_id': pricing['pricelist_id'],
+                'currency': pricing['currency'],
+                'order_lines': result_lines,
+                'amount_untaxed': pricing['amount_untaxed'],
+                'amount_tax': pricing['amount_tax'],
+                'amount_total': pricing['amount_total'],
+                'credit': credit,
+            },
+            'errors': errors,
+        }
+
+    def _bulk_create_sales_orders(self, data):
+        '''creates many orders in one call, e.g the queued orders of an offline device
+        data = {
+            'operation': 'bulk_create',
+            'idempotency_key': '3f1c9a...' or null, # also accepted by the create operation
+            'orders': [
+                {'partner_id': 3, 'company_id': 1, 'order_lines': [{'product_id': 1, 'product_uom_qty': 2}]},
+                ...
+            ]
+        }
+        every order gets its own result entry, a failing order does not prevent
+        the creation of the others
+        with 'async': True the orders are queued and processed in the background
+        '''
+        orders = data.get('orders')
+        if not orders or not isinstance(orders, list):
+            return invalid_response(
+                "missing_parameter",
+                "Missing required parameters"
+                " [orders]",
+                400,
+            )
+        if data.get_bool('async'):
+            return self._enqueue_sales_orders(orders)
+        results = request.env['sale.order'].sudo()._salesman_bulk_create(orders)
+        return {
+            'success': all(result['success'] for result in results),
+            'data': results,
+            }
+
+    def _enqueue_sales_orders(self, orders):
+        '''validates the orders and queues them, the confirmation and invoicing
+        are done by the queue cron, their progress is reported by /api/sales_order/job-status
+        '''
+        invalid = [
+            index for index, order in enumerate(orders)
+            if not isinstance(order, dict) or not order.get('partner_id')
+            or not isinstance(order.get('order_lines'), list) or not order.get('order_lines')
+        ]
+        if invalid:
+            return invalid_response(
+                "missing_parameter",
+                "Missing required parameters [partner_id, order_lines]"
+                f" for the orders at index {', '.join(map(str, invalid))}",
+                400,
+            )
+        jobs = request.env['salesman.order.job']._salesman_enqueue(orders)
+        return {
+            'success': True,
+            'status_code': 202,
+            'data': [{'job_id': job.id, 'state': job.state} for job in jobs],
+            }
+
     def validate_invoice_and_post_journal(
         self, journal_id, inv): 
         """To be used only when they request for automatic payment generation
         journal: set to the cash journal default bank journal is 7
         """
-        inbound_payment_method = request.env['account.payment.method'].sudo().search(
-            [('code', '=', 'manual'), ('payment_type', '=', 'inbound')], limit=1)
-        payment_method = 2
-        if journal_id:
-            payment_method = journal_id.inbound_payment_method_line_ids[0].id if \
-                journal_id.inbound_payment_method_line_ids else inbound_payment_method.id \
-                    if inbound_payment_method else payment_method
-        payment_method_line_id = self.get_payment_method_line_id('inbound', journal_id)
-        payment_vals = {
+        payment_method = self._get_inbound_payment_method_line_id(journal_id)
+        payment_vals = self._prepare_payment_vals(inv, payment_method, journal_id)
+        payments = request.env['account.payment'].with_context(**PAYMENT_SKIP_CONTEXT).create(payment_vals)
+        # payments = request.env['account.payment'].create(payment_vals)
+        # payments._synchronize_from_moves(False)
+        payments.action_post()
+
+    def _get_inbound_payment_method_line_id(self, journal_id):
+        '''returns the payment method used for the customer payments of the journal'''
+        return request.env['salesman.reference.resolver']._get_inbound_payment_method_line_id(journal_id.id)
+
+    def _get_payment_journal(self, journal_id):
+        '''returns the bank or cash journal of the user company matching journal_id'''
+        journal_ids = request.env['salesman.reference.resolver']._get_payment_journal_ids(request.env.company.id)
+        journal_id = int(journal_id)
+        return request.env['account.journal'].sudo().browse(journal_id if journal_id in journal_ids else [])
+
+    def _get_branch_scope(self):
+        '''returns the (branch_ids, warehouses) of the user in the current company,
+        branch_ids is None when the user is not restricted to branches, resolved
+        once per request from the cache of the reference resolver
+        '''
+        scope = getattr(request, '_salesman_branch_scope', None)
+        if scope is None:
+            branch_ids, warehouse_ids = request.env['salesman.reference.resolver']._get_branch_scope(
+                request.env.uid, request.env.company.id)
+            scope = request._salesman_branch_scope = (
+                list(branch_ids) if branch_ids is not None else None,
+                request.env['stock.warehouse'].browse(warehouse_ids),
+            )
+        return scope
+
+    def _get_user_warehouses(self):
+        '''returns the warehouses of the user branches, the default warehouse of
+        the company when the user has no branch'''
+        return self._get_branch_scope()[1]
+
+    def _branch_domain(self, model, shared=True):
+        '''restricts the records of model to the branches of the user when both
+        have branches, the records without branch are shared by all of them
+        unless shared is False'''
+        branch_ids, _warehouses = self._get_branch_scope()
+        return request.env['salesman.reference.resolver']._get_branch_domain(model, branch_ids, shared=shared)
+
+    def _order_domain(self):
+        '''restricts the sales orders to the branches of the user, by their
+        warehouse when the orders have no branch'''
+        branch_ids, warehouses = self._get_branch_scope()
+        orders = request.env['sale.order']
+        if branch_ids is None:
+            return []
+        if 'branch_id' in orders._fields:
+            return [('branch_id', 'in', branch_ids)]
+        return [('warehouse_id', 'in', warehouses.ids)]
+
+    def _prepare_payment_vals(self, inv, payment_method, journal):
+        return {
             'date': fields.Date.today(),
-            'amount': inv.amount_total,
+            # a partially paid invoice is only paid what is still due
+            'amount': inv.amount_residual,
             'payment_type': 'inbound',
             # 'is_internal_transfer': True,
             'partner_type': 'customer',
             'ref': inv.name,
             # 'move_id': inv.id,
-            # 'journal_id': 8, #inv.payment_journal_id.id,
+            'journal_id': journal.id,
             'currency_id': inv.currency_id.id,
             'partner_id': inv.partner_id.id,
             # 'destination_account_id': inv.line_ids[1].account_id.id,
-            'payment_method_line_id': payment_method, #payment_method_line_id.id if payment_method_line_id else payment_method,
+            'payment_method_line_id': payment_method,
         }
-        
-        '''
-        Add the skip context to avoid;  
-        Journal Entry Draft Entry PBNK1/2023/00002 is not valid. 
-        In order to proceed, the journal items must include one and only
-        one outstanding payments/receipts account.
+
+    def _validate_invoices_batch(self, data):
+        '''where data is equal to the batch payload of /api/v1/invoice-validation
+        the invoices are found by one search, the drafts are posted together and
+        the payments are created and posted in one go, when a batch step fails
+        it is retried invoice by invoice so every invoice reports its own result
         '''
-        skip_context = {
-            'skip_invoice_sync':True,
-            'skip_invoice_line_sync':True,
-            'skip_account_move_synchronization':True,
-            'check_move_validity':False,
-        }
-        payments = request.env['account.payment'].with_context(**skip_context).create(payment_vals)
-        # payments = request.env['account.payment'].create(payment_vals)
-        # payments._synchronize_from_moves(False)
-        payments.action_post()
+        invoice_numbers = data.get('invoice_numbers') or []
+        invoice_ids = data.get('invoice_ids') or []
+        journal_id = data.get('journal_id')
+        is_register_payment = data.get_bool('is_register_payment')
+        if not isinstance(invoice_numbers, list) or not isinstance(invoice_ids, list) \
+                or any(type(invoice_id) != int for invoice_id in invoice_ids):
+            return invalid_response(
+                "invoices",
+                "invoice_numbers must be a list of invoice numbers and invoice_ids a list of integers"
+                " [invoice_numbers, invoice_ids]",
+                400,
+            )
+        journal = request.env['account.journal']
+        if is_register_payment:
+            if not journal_id:
+                return invalid_response(
+                    "missing_parameter",
+                    "Please provide a journal id"
+                    " [journal_id]",
+                    200,
+                )
+            journal = self._get_payment_journal(journal_id)
+            if not journal:
+                return invalid_response(
+                    "missing_parameter",
+                    "Provide Journal id does not exist in the database"
+                    " [journal_id]",
+                    200,
+                )
+        invoices = request.env['account.move'].sudo().search([
+            '|', ('name', 'in', invoice_numbers),
+            ('id', 'in', invoice_ids)])
+        errors = {}
+
+        def run_batch(records, func):
+            '''calls func on all the records, one by one when the batch fails'''
+            try:
+                with request.env.cr.savepoint():
+                    func(records)
+            except Exception as e:
+                _logger.info("Batch invoice validation failed (%s), retrying invoice by invoice", e)
+                for record in records:
+                    try:
+                        with request.env.cr.savepoint():
+                            func(record)
+                    except Exception as e:
+                        errors[record.id] = str(e)
+
+        run_batch(invoices.filtered(lambda inv: inv.state == 'draft'), lambda moves: moves.action_post())
+        payments_by_invoice, messages = {}, {}
+        if is_register_payment:
+            payment_method = self._get_inbound_payment_method_line_id(journal)
+            to_pay = invoices.filtered(lambda inv: inv.id not in errors and inv.state == 'posted')
+            # a validation run again must not pay the same invoices twice
+            for inv in to_pay:
+                if inv.move_type not in PAYABLE_MOVE_TYPES:
+                    errors[inv.id] = 'Only customer invoices and receipts can be paid'
+                elif inv.payment_state in PAID_PAYMENT_STATES or inv.currency_id.is_zero(inv.amount_residual):
+                    messages[inv.id] = 'The invoice is already paid, no payment registered'
+            to_pay = to_pay.filtered(lambda inv: inv.id not in errors and inv.id not in messages)
+
+            def create_payments(moves):
+                vals_list = [self._prepare_payment_vals(inv, payment_method, journal) for inv in moves]
+                payments = request.env['account.payment'].with_context(**PAYMENT_SKIP_CONTEXT).create(vals_list)
+                payments.action_post()
+                self._reconcile_payments(moves, payments)
+                payments_by_invoice.update(zip(moves.ids, payments.ids))
+
+            run_batch(to_pay, create_payments)
+
+        results = [{
+            'invoice_id': inv.id,
+            'invoice_number': inv.name,
+            'success': inv.id not in errors,
+            'payment_id': payments_by_invoice.get(inv.id),
+            'message': errors.get(inv.id) or messages.get(inv.id),
+        } for inv in invoices]
+        found = set(invoices.ids) | set(invoices.mapped('name'))
+        results += [{
+            'invoice_id': reference if type(reference) == int else None,
+            'invoice_number': reference if type(reference) != int else None,
+            'success': False,
+            'message': 'No invoice found',
+        } for reference in invoice_ids + invoice_numbers if reference not in found]
+        return {
+            'success': all(result['success'] for result in results),
+            'data': results,
+            }
         
+    def _reconcile_payments(self, invoices, payments):
+        '''matches the receivable line of every payment with its invoice so the
+        invoice is marked as paid, the payments are in the order of the invoices'''
+        for inv, payment in zip(invoices, payments):
+            lines = (inv.line_ids | payment.move_id.line_ids).filtered(
+                lambda line: line.account_id.account_type == 'asset_receivable' and not line.reconciled)
+            if len(lines.account_id) == 1 and len(lines) > 1:
+                lines.reconcile()
+
     def _update_sales_order(self, data):
-        '''Update an existing sales order.'''
+        '''Update an existing sales order.
+        data = {
+            'operation': 'update',
+            'id': 3,
+            'replace': False, # True removes the product lines missing from order_lines
+            'order_lines': [
+                {'id': 7, 'product_uom_qty': 3}, # updates the line 7
+                {'product_id': 1, 'product_uom_qty': 2}, # updates the next line of the product or adds one
+            ],
+            ... # any other sales order value
+        }
+        '''
         data.pop('operation', None)
+        data.pop('idempotency_key', None)
         order_id = data.pop('id')
+        replace = data.pop('replace', False)
         
-        order = request.env['sale.order'].sudo().browse(order_id)
+        order = request.env['sale.order'].sudo().search([('id', '=', order_id)] + self._order_domain())
         if order:
             order_lines = data.pop('order_lines', None)
             if order_lines:
-                updated_order_lines = []
-                existing_product_ids = order.order_line.mapped('product_id.id')
-
-                for line in order_lines:
-                    product_id = line.get('product_id')
-                    
-                    if product_id in existing_product_ids:
-                        existing_line = order.order_line.search([('order_id', '=', order.id),('product_id.id', '=', product_id)], limit=1)
-                        updated_order_lines.append((1, existing_line.id, line))
-                    else:
-                        updated_order_lines.append((0, 0, line))
-
-                data['order_line'] = updated_order_lines
+                data['order_line'] = order._salesman_order_line_commands(order_lines, replace=replace)
 
             order.write(data)
             return {'success': True, 'order_id': order.id}
@@ -455,31 +1392,92 @@ class SalesManController(http.Controller):
         e.g data = { 'id': 3, ...}
         '''
         order_id = data.get('id')
-        so_number = data.get('so_number')
+        so_number = data.get_str('so_number')
 
         if order_id or so_number:
-            order = request.env['sale.order'].sudo().search([
+            orders = request.env['sale.order'].sudo().search_read([
                 '|', ('id', '=', order_id), ('name', '=', so_number)
-            ], limit=1)
+            ] + self._order_domain(), SALE_ORDER_FIELDS, limit=1, load=None)
 
-            if not order:
+            if not orders:
                 return {'success': False, 'message': 'Sales order not found'}
             
-            order_data = {
-                'id': order.id,
-                'name': order.name,
-                'partner_id': order.partner_id.id,
-                'date_order': order.date_order.strftime('%Y-%m-%d %H:%M:%S'),
-                'order_line': [{
-                    'product_id': line.product_id.id,
-                    'product_uom_qty': line.product_uom_qty,
-                    'price_unit': line.price_unit
-                } for line in order.order_line]
-            }
-            return {'success': True, 'result': order_data}
+            return {'success': True, 'result': self._serialize_sales_orders(orders)[0]}
 
         return {'success': False, 'message': 'Missing order ID or SO number'}
 
+    def _list_sales_orders(self, data):
+        '''where data is equal to the sent payload for list, every filter is optional
+        data = {
+            'operation': 'list',
+            'ids': [3, 4], 'names': ['S00003'],
+            'partner_ids': [7], 'user_id': 2, # salesman
+            'state': 'sale' or ['draft', 'sale'],
+            'date_from': '2024-05-01', 'date_to': '2024-05-31', # inclusive order dates
+            'limit': 100, 'after_id': 0, # next_cursor of the previous page
+        }
+        '''
+        domain = []
+        for key, field_name in [('ids', 'id'), ('partner_ids', 'partner_id')]:
+            values = data.get(key)
+            if values:
+                if not isinstance(values, list) or any(type(value) != int for value in values):
+                    raise ValidationError(f"{key} provided must be a list of integers")
+                domain.append((field_name, 'in', values))
+        if data.get('names'):
+            if not isinstance(data['names'], list):
+                raise ValidationError("names provided must be a list of sales order numbers")
+            domain.append(('name', 'in', data['names']))
+        if data.get('user_id'):
+            if type(data['user_id']) != int:
+                raise ValidationError("user_id provided must be an integer")
+            domain.append(('user_id', '=', data['user_id']))
+        if data.get('state'):
+            states = data['state'] if isinstance(data['state'], list) else [data['state']]
+            domain.append(('state', 'in', states))
+        try:
+            if data.get('date_from'):
+                domain.append(('date_order', '>=', fields.Date.to_date(data['date_from'])))
+            if data.get('date_to'):
+                domain.append(('date_order', '<', fields.Date.to_date(data['date_to']) + timedelta(days=1)))
+        except (TypeError, ValueError):
+            raise ValidationError("date_from and date_to provided must be dates formatted as YYYY-MM-DD")
+        domain += self._order_domain()
+        limit, after_id = self._get_page_params(data)
+        orders, next_cursor = self._search_read_page(
+            request.env['sale.order'].sudo(), domain, SALE_ORDER_FIELDS, limit, after_id, load=None)
+        return {
+            'success': True,
+            'data': self._serialize_sales_orders(orders),
+            'next_cursor': next_cursor,
+            }
+
+    def _serialize_sales_orders(self, orders, env=None):
+        '''serializes the orders read by search_read, the lines of every order are
+        read together by one search_read on sale.order.line
+        '''
+        env = env or request.env
+        lines = env['sale.order.line'].sudo().search_read(
+            [('order_id', 'in', [order['id'] for order in orders])],
+            SALE_ORDER_LINE_FIELDS, order='order_id, sequence, id', load=None)
+        lines_by_order = defaultdict(list)
+        for line in lines:
+            lines_by_order[line['order_id']].append({
+                'product_id': line['product_id'],
+                'product_uom_qty': line['product_uom_qty'],
+                'price_unit': line['price_unit']
+            })
+        return [{
+            'id': order['id'],
+            'name': order['name'],
+            'partner_id': order['partner_id'],
+            'user_id': order['user_id'] or None,
+            'state': order['state'],
+            'amount_total': order['amount_total'],
+            'date_order': order['date_order'].strftime('%Y-%m-%d %H:%M:%S'),
+            'order_line': lines_by_order[order['id']],
+        } for order in orders]
+
     # @validate_token
     # @http.route(['/api/v1/create_payment'], type="http", auth="none", methods=["POST"], csrf=False)
     # def create_payment(self, **post):
@@ -1 +1,16 @@
-# from . import sales_order
\ No newline at end of file
+from . import sales_order
+from . import sync_tombstone
+from . import product_pricelist
+from . import product_product
+from . import product_template
+from . import res_partner
+from . import res_users
+from . import stock_quant
+from . import stock_move
+from . import idempotency_key
+from . import order_job
+from . import reference_resolver
+from . import sync_bundle
+from . import sales_rollup
+from . import account_move
+from . import account_move_line
@@ -0,0 +1,18 @@
+from odoo import models
+
+
+class AccountMove(models.Model):
+    _inherit = 'account.move'
+
+    def _post(self, soft=True):
+        posted = super()._post(soft=soft)
+        self.env['account.move.line']._salesman_invalidate_statements(posted.commercial_partner_id.ids)
+        return posted
+
+    def button_draft(self):
+        self.env['account.move.line']._salesman_invalidate_statements(self.commercial_partner_id.ids)
+        return super().button_draft()
+
+    def button_cancel(self):
+        self.env['account.move.line']._salesman_invalidate_statements(self.commercial_partner_id.ids)
+        return super().button_cancel()
@@ -0,0 +1,119 @@
+from odoo import api, fields, models
+
+from ..tools import TTLCache
+
+# seconds a computed statement is served from the cache, the
+# odoo_salesman.statement_cache_ttl parameter overrides it (0 disables the cache)
+# the cache is per worker and only the worker posting an invoice or a payment
+# drops its statements, the other ones serve the old balances until they expire
+STATEMENT_CACHE_TTL = 10
+
+# {(dbname, company_ids, partner_id, date): statement}, per worker
+statement_cache = TTLCache(maxsize=20000)
+
+# aging buckets: (name, first day past due, last day past due), the invoices
+# not due yet are in the first bucket
+AGING_BUCKETS = [('0_30', None, 30), ('31_60', 31, 60), ('61_90', 61, 90), ('90_plus', 91, None)]
+
+INVOICE_FIELDS = ['name', 'move_type', 'commercial_partner_id', 'invoice_date', 'invoice_date_due',
+                  'currency_id', 'amount_total', 'amount_residual']
+
+
+class AccountMoveLine(models.Model):
+    _inherit = 'account.move.line'
+
+    def reconcile(self):
+        self._salesman_invalidate_statements(self.partner_id.commercial_partner_id.ids)
+        return super().reconcile()
+
+    def remove_move_reconcile(self):
+        self._salesman_invalidate_statements(self.partner_id.commercial_partner_id.ids)
+        return super().remove_move_reconcile()
+
+    @api.model
+    def _salesman_invalidate_statements(self, partner_ids):
+        '''drops the cached statements of the partners, again once the transaction
+        is committed like the availability cache'''
+        if not partner_ids:
+            return
+        tags = [(self.env.cr.dbname, partner_id) for partner_id in partner_ids]
+        statement_cache.invalidate_tags(tags)
+        self.env.cr.postcommit.add(lambda: statement_cache.invalidate_tags(tags))
+
+    @api.model
+    def _salesman_get_statements(self, partners, use_cache=True):
+        '''returns {partner_id: statement} with the receivable still due by the
+        commercial partner of every partner split in aging buckets of days past
+        due and its open invoices, the buckets of all the partners missing from
+        the cache are summed by one grouped query and their invoices read at once
+        '''
+        ttl = 0
+        if use_cache:
+            ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+                'odoo_salesman.statement_cache_ttl', STATEMENT_CACHE_TTL))
+        dbname = self.env.cr.dbname
+        company_ids = tuple(sorted(self.env.companies.ids))
+        today = fields.Date.context_today(self)
+        commercial_ids = {partner.id: partner.commercial_partner_id.id for partner in partners}
+        statements = {}
+        if ttl > 0:
+            for commercial_id in set(commercial_ids.values()):
+                statement = statement_cache.get((dbname, company_ids, commercial_id, today))
+                if statement is not None:
+                    statements[commercial_id] = statement
+        missing_ids = list(set(commercial_ids.values()) - set(statements))
+        if missing_ids:
+            computed = {commercial_id: {
+                'total_due': 0.0,
+                'aging': dict.fromkeys([bucket[0] for bucket in AGING_BUCKETS], 0.0),
+                'invoices': [],
+            } for commercial_id in missing_ids}
+            lines = self.sudo()
+            query = lines._where_calc([
+                ('partner_id', 'in', missing_ids),
+                ('company_id', 'in', list(company_ids)),
+                ('account_id.account_type', '=', 'asset_receivable'),
+                ('parent_state', '=', 'posted'),
+                ('reconciled', '=', False),
+            ])
+            from_clause, where_clause, where_params = query.get_sql()
+            overdue = "(%s::date - COALESCE(account_move_line.date_maturity, account_move_line.date))"
+            buckets, bucket_params = [], []
+            for _name, first_day, last_day in AGING_BUCKETS:
+                conditions = []
+                if first_day is not None:
+                    conditions.append(f"{overdue} >= {first_day}")
+                if last_day is not None:
+                    conditions.append(f"{overdue} <= {last_day}")
+                buckets.append(f"SUM(account_move_line.amount_residual) FILTER (WHERE {' AND '.join(conditions)})")
+                bucket_params += [today] * len(conditions)
+            lines.flush_model(['partner_id', 'company_id', 'account_id', 'parent_state', 'reconciled',
+                               'amount_residual', 'date_maturity', 'date'])
+            self.env.cr.execute(f"""
+                SELECT account_move_line.partner_id, SUM(account_move_line.amount_residual), {', '.join(buckets)}
+                  FROM {from_clause}
+                 WHERE {where_clause}
+              GROUP BY account_move_line.partner_id
+            """, bucket_params + where_params)
+            for row in self.env.cr.fetchall():
+                statement = computed[row[0]]
+                statement['total_due'] = row[1] or 0.0
+                for (name, _first_day, _last_day), amount in zip(AGING_BUCKETS, row[2:]):
+                    statement['aging'][name] = amount or 0.0
+
+            invoices = self.env['account.move'].sudo().search_read([
+                ('commercial_partner_id', 'in', missing_ids),
+                ('company_id', 'in', list(company_ids)),
+                ('move_type', 'in', ('out_invoice', 'out_refund')),
+                ('state', '=', 'posted'),
+                ('payment_state', 'in', ('not_paid', 'partial')),
+            ], INVOICE_FIELDS, order='invoice_date_due, id', load=None)
+            for invoice in invoices:
+                computed[invoice['commercial_partner_id']]['invoices'].append(invoice)
+            for commercial_id, statement in computed.items():
+                statements[commercial_id] = statement
+                if ttl > 0:
+                    statement_cache.set((dbname, company_ids, commercial_id, today), statement, ttl,
+                                        tags=[(dbname, commercial_id)])
+        return {partner_id: dict(statements[commercial_id], partner_id=partner_id, commercial_partner_id=commercial_id)
+                for partner_id, commercial_id in commercial_ids.items()}
@@ -0,0 +1,127 @@
+import psycopg2
+
+from odoo import api, fields, models
+from odoo.tools import mute_logger
+
+from ..tools.payload import dumps, loads
+
+# hours a processed key is replayed, the odoo_salesman.idempotency_key_hours
+# parameter overrides it
+IDEMPOTENCY_KEY_HOURS = 24
+
+
+class SalesmanIdempotencyKey(models.Model):
+    _name = 'salesman.idempotency.key'
+    _description = 'Salesman API idempotency key'
+    _order = 'id desc'
+
+    key = fields.Char(required=True)
+    operation = fields.Char(required=True)
+    user_id = fields.Many2one('res.users', required=True, ondelete='cascade', default=lambda self: self.env.user)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+    ], required=True, default='pending')
+    response = fields.Text()
+    sale_order_ids = fields.Many2many('sale.order', string='Sales Orders')
+    invoice_ids = fields.Many2many('account.move', string='Invoices')
+    expires_at = fields.Datetime(required=True, index=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(user_id, operation, key)', 'The idempotency key was already used.'),
+    ]
+
+    @api.model
+    def _salesman_run(self, key, operation, func):
+        '''runs func once per key, a key already processed replays its stored
+        response, a key still being processed by another request is rejected
+        the response is stored as soon as the request persisted something, e.g
+        the orders of a bulk_create created before another one failed, only the
+        requests which wrote nothing release their key to be retried
+        '''
+        now = fields.Datetime.now()
+        domain = [('key', '=', key), ('operation', '=', operation), ('user_id', '=', self.env.uid)]
+        record = self.sudo().search(domain, limit=1)
+        if record and record.expires_at > now:
+            if record.state == 'done':
+                return loads(record.response)
+            return self._salesman_in_progress_response()
+        # the expired key still holds the unique constraint
+        record.unlink()
+
+        hours = int(self.env['ir.config_parameter'].sudo().get_param(
+            'odoo_salesman.idempotency_key_hours', IDEMPOTENCY_KEY_HOURS))
+        try:
+            # blocks until a concurrent request holding the same key is over
+            with mute_logger('odoo.sql_db'), self.env.cr.savepoint():
+                record = self.sudo().create({
+                    'key': key,
+                    'operation': operation,
+                    'user_id': self.env.uid,
+                    'expires_at': fields.Datetime.add(now, hours=hours),
+                })
+        except psycopg2.IntegrityError:
+            # the concurrent request may have completed while this one waited
+            record = self.sudo().search(domain, limit=1)
+            if record.state == 'done':
+                return loads(record.response)
+            return self._salesman_in_progress_response()
+
+        try:
+            with self.env.cr.savepoint():
+                response = func()
+        except Exception:
+            record.unlink()
+            raise
+        if not isinstance(response, dict) or not self._salesman_is_persisted(response):
+            record.unlink()
+            return response
+        sale_order_ids, invoice_ids = self._salesman_response_ids(response)
+        record.write({
+            'state': 'done',
+            'response': dumps(response).decode(),
+            'sale_order_ids': [(6, 0, sale_order_ids)],
+            'invoice_ids': [(6, 0, invoice_ids)],
+        })
+        return response
+
+    @api.model
+    def _salesman_in_progress_response(self):
+        return {
+            'success': False,
+            'message': 'A request with this idempotency key is still being processed, retry later',
+        }
+
+    @api.model
+    def _salesman_response_entries(self, response):
+        data = response.get('data')
+        entries = data if isinstance(data, list) else [data]
+        return [entry for entry in entries if isinstance(entry, dict)]
+
+    @api.model
+    def _salesman_is_persisted(self, response):
+        '''whether the request wrote something: it succeeded or one of its
+        entries did or created a sales order or a payment'''
+        if response.get('success'):
+            return True
+        return any(
+            entry.get('success') or entry.get('so_id') or entry.get('payment_id')
+            for entry in self._salesman_response_entries(response))
+
+    @api.model
+    def _salesman_response_ids(self, response):
+        '''returns the sales order and invoice ids found in the response data'''
+        sale_order_ids, invoice_ids = [], []
+        for entry in self._salesman_response_entries(response):
+            # the failed entries may reference a record which does not exist
+            if entry.get('success') is False:
+                continue
+            if type(entry.get('so_id')) == int:
+                sale_order_ids.append(entry['so_id'])
+            if type(entry.get('invoice_id')) == int:
+                invoice_ids.append(entry['invoice_id'])
+        return sale_order_ids, invoice_ids
+
+    @api.autovacuum
+    def _gc_expired_keys(self):
+        self.sudo().search([('expires_at', '<', fields.Datetime.now())]).unlink()
@@ -0,0 +1,98 @@
+import logging
+from collections import defaultdict
+
+from odoo import api, fields, models
+from odoo.tools.sql import create_index
+
+from ..tools.payload import dumps, loads
+
+_logger = logging.getLogger(__name__)
+
+# jobs locked and processed per transaction by the queue cron
+JOB_BATCH_SIZE = 100
+
+
+class SalesmanOrderJob(models.Model):
+    _name = 'salesman.order.job'
+    _description = 'Salesman API queued sales order'
+    _order = 'id'
+
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], required=True, default='pending')
+    payload = fields.Text(required=True)
+    user_id = fields.Many2one('res.users', required=True, ondelete='cascade', default=lambda self: self.env.user)
+    company_id = fields.Many2one('res.company', ondelete='cascade', default=lambda self: self.env.company)
+    sale_order_id = fields.Many2one('sale.order', ondelete='set null')
+    invoice_id = fields.Many2one('account.move', ondelete='set null')
+    error = fields.Text()
+    done_at = fields.Datetime()
+
+    def init(self):
+        create_index(self._cr, 'salesman_order_job_pending_index', self._table, ['id'],
+                     where="state = 'pending'")
+
+    @api.model
+    def _salesman_enqueue(self, orders_data):
+        '''persists one job per order and wakes the queue cron up'''
+        jobs = self.sudo().create([{
+            'payload': dumps(data).decode(),
+            'user_id': self.env.uid,
+            'company_id': self.env.company.id,
+        } for data in orders_data])
+        self.env.ref('odoo_salesman.ir_cron_salesman_order_jobs').sudo()._trigger()
+        return jobs
+
+    @api.model
+    def _salesman_process_jobs(self, batch_size=JOB_BATCH_SIZE, max_batches=10, auto_commit=False):
+        '''drains the queue by batches, every batch is locked with SKIP LOCKED so
+        concurrent workers never process the same job, its orders are created,
+        confirmed and invoiced together by sale.order._salesman_bulk_create as
+        the user who queued them in their company, like the synchronous requests,
+        so the orders get that salesman and company rather than those of the cron
+        '''
+        for _batch in range(max_batches):
+            self.env.cr.execute("""
+                SELECT id FROM salesman_order_job
+                 WHERE state = 'pending'
+              ORDER BY id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, [batch_size])
+            jobs = self.sudo().browse([row[0] for row in self.env.cr.fetchall()])
+            if not jobs:
+                break
+            jobs_by_user = defaultdict(lambda: self.sudo())
+            for job in jobs:
+                jobs_by_user[(job.user_id, job.company_id)] |= job
+            now = fields.Datetime.now()
+            for (user, company), user_jobs in jobs_by_user.items():
+                orders = self.env['sale.order'].with_user(user).with_company(company or user.company_id).sudo()
+                results = orders._salesman_bulk_create([loads(job.payload) for job in user_jobs])
+                for job, result in zip(user_jobs, results):
+                    if result['success']:
+                        job.write({
+                            'state': 'done',
+                            'sale_order_id': result['so_id'],
+                            'invoice_id': result['invoice_id'],
+                            'done_at': now,
+                        })
+                    else:
+                        job.write({'state': 'failed', 'error': result['message'], 'done_at': now})
+            _logger.info("Processed %s queued sales orders", len(jobs))
+            if auto_commit:
+                self.env.cr.commit()
+            if len(jobs) < batch_size:
+                break
+
+    def _salesman_status(self):
+        return [{
+            'job_id': job.id,
+            'state': job.state,
+            'so_id': job.sale_order_id.id or None,
+            'so_number': job.sale_order_id.name or None,
+            'invoice_id': job.invoice_id.id or None,
+            'message': job.error or None,
+        } for job in self]
@@ -0,0 +1,163 @@
+import bisect
+
+from odoo import api, fields, models
+
+from ..tools import TTLCache
+
+# seconds a computed price is served from the cache, the
+# odoo_salesman.pricing_cache_ttl parameter overrides it (0 disables the cache)
+PRICING_CACHE_TTL = 60
+
+# {(dbname, pricelist_id, product_id, qty_bracket, date): (price_unit, discount)}, per worker
+pricing_cache = TTLCache(maxsize=50000)
+
+# product fields the pricelist rules compute the prices from
+PRICE_FIELDS = {'list_price', 'lst_price', 'standard_price', 'uom_id', 'currency_id', 'categ_id'}
+
+
+class ProductPricelist(models.Model):
+    _inherit = 'product.pricelist'
+
+    def write(self, vals):
+        res = super().write(vals)
+        self._salesman_invalidate_prices()
+        return res
+
+    def unlink(self):
+        self._salesman_invalidate_prices()
+        return super().unlink()
+
+    @api.model
+    def _salesman_invalidate_prices(self, product_ids=None):
+        '''drops the cached prices of the products, or of every product when a
+        pricelist or a rule changes since rules are inherited by other pricelists,
+        again once the transaction is committed like the availability cache
+        '''
+        dbname = self.env.cr.dbname
+        if product_ids is None:
+            tags = [(dbname,)]
+        else:
+            tags = [(dbname, product_id) for product_id in product_ids]
+        if not tags:
+            return
+        pricing_cache.invalidate_tags(tags)
+        self.env.cr.postcommit.add(lambda: pricing_cache.invalidate_tags(tags))
+
+    @api.model
+    def _salesman_qty_brackets(self, ttl=PRICING_CACHE_TTL):
+        '''returns the sorted minimum quantities of the pricelist rules, the price
+        of a product is the same for every quantity between two of them, cached
+        for ttl seconds (0 reads them again)
+        '''
+        key = (self.env.cr.dbname, 'qty_brackets')
+        brackets = pricing_cache.get(key) if ttl > 0 else None
+        if brackets is None:
+            self.env['product.pricelist.item'].flush_model(['min_quantity'])
+            self.env.cr.execute(
+                "SELECT DISTINCT min_quantity FROM product_pricelist_item"
+                " WHERE min_quantity > 0 ORDER BY min_quantity")
+            brackets = [0.0] + [row[0] for row in self.env.cr.fetchall()]
+            if ttl > 0:
+                pricing_cache.set(key, brackets, ttl, tags=[(self.env.cr.dbname,)])
+        return brackets
+
+    def _salesman_get_prices(self, lines, partner=None, use_cache=True, product_domain=()):
+        '''prices a cart of [{'product_id': 1, 'product_uom_qty': 2}, ...] with the
+        pricelist, the taxes of the partner fiscal position and the discount shown
+        when the pricelist hides it in the price, returns one dict per line.
+        The quantities falling between the same rule minimums share one price so
+        the missing prices are computed by one _get_products_price per bracket.
+        The products out of product_domain are answered as not found.
+        '''
+        self.ensure_one()
+        ttl = 0
+        if use_cache:
+            ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+                'odoo_salesman.pricing_cache_ttl', PRICING_CACHE_TTL))
+        dbname = self.env.cr.dbname
+        date = fields.Date.context_today(self)
+        company = self.company_id or self.env.company
+        currency = self.currency_id
+        products = self.env['product.product'].search(
+            [('id', 'in', list({line['product_id'] for line in lines}))] + list(product_domain))
+        products_by_id = {product.id: product for product in products}
+        brackets = self._salesman_qty_brackets(ttl)
+
+        def bracket(qty):
+            return brackets[max(bisect.bisect_right(brackets, qty) - 1, 0)]
+
+        prices, missing = {}, {}
+        for line in lines:
+            product_id = line['product_id']
+            if product_id not in products_by_id:
+                continue
+            key = (product_id, bracket(float(line.get('product_uom_qty') or 0)))
+            if key in prices or product_id in missing.get(key[1], ()):
+                continue
+            cached = pricing_cache.get((dbname, self.id) + key + (date,)) if ttl > 0 else None
+            if cached is not None:
+                prices[key] = cached
+            else:
+                missing.setdefault(key[1], set()).add(product_id)
+
+        for qty, product_ids in missing.items():
+            bracket_products = products.browse(product_ids)
+            computed = self._get_products_price(bracket_products, qty, date=date)
+            for product in bracket_products:
+                price_unit, discount = computed[product.id], 0.0
+                if self.discount_policy == 'without_discount':
+                    list_price = product.currency_id._convert(product.lst_price, currency, company, date)
+                    if list_price > price_unit:
+                        price_unit, discount = list_price, (list_price - price_unit) / list_price * 100
+                prices[(product.id, qty)] = (price_unit, discount)
+                if ttl > 0:
+                    pricing_cache.set(
+                        (dbname, self.id, product.id, qty, date), (price_unit, discount), ttl,
+                        tags=[(dbname,), (dbname, product.id)])
+
+        fiscal_position = self.env['account.fiscal.position']
+        if partner:
+            fiscal_position = fiscal_position.with_company(company)._get_fiscal_position(partner)
+        result = []
+        for line in lines:
+            product_id = line['product_id']
+            qty = float(line.get('product_uom_qty') or 0)
+            product = products_by_id.get(product_id)
+            if product is None:
+                result.append({'product_id': product_id, 'product_uom_qty': qty, 'message': 'No product found'})
+                continue
+            price_unit, discount = prices[(product_id, bracket(qty))]
+            taxes = fiscal_position.map_tax(product.taxes_id.filtered(lambda tax: tax.company_id == company))
+            totals = taxes.compute_all(
+                price_unit * (1 - discount / 100), currency=currency, quantity=qty,
+                product=product, partner=partner)
+            result.append({
+                'product_id': product_id,
+                'product_uom_qty': qty,
+                'price_unit': price_unit,
+                'discount': discount,
+                'tax_ids': taxes.ids,
+                'price_subtotal': totals['total_excluded'],
+                'price_tax': totals['total_included'] - totals['total_excluded'],
+                'price_total': totals['total_included'],
+            })
+        return result
+
+
+class ProductPricelistItem(models.Model):
+    _inherit = 'product.pricelist.item'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        items = super().create(vals_list)
+        self.env['product.pricelist']._salesman_invalidate_prices()
+        return items
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['product.pricelist']._salesman_invalidate_prices()
+        return res
+
+    def unlink(self):
+        self.env['product.pricelist']._salesman_invalidate_prices()
+        return super().unlink()
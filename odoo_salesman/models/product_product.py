@@ -0,0 +1,25 @@
+from odoo import models
+from odoo.tools.sql import create_index
+
+from .product_pricelist import PRICE_FIELDS
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    def init(self):
+        super().init()
+        # delta syncs of the salesman API filter on write_date
+        create_index(self._cr, 'product_product_write_date_index', self._table, ['write_date'])
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PRICE_FIELDS.intersection(vals):
+            self.env['product.pricelist']._salesman_invalidate_prices(self.ids)
+        return res
+
+    def unlink(self):
+        res_ids = self.ids
+        res = super().unlink()
+        self.env['salesman.sync.tombstone']._record_deletion(self._name, res_ids)
+        return res
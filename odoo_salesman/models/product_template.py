@@ -0,0 +1,20 @@
+from odoo import models
+from odoo.tools.sql import create_index
+
+from .product_pricelist import PRICE_FIELDS
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    def init(self):
+        super().init()
+        # the product delta syncs of the salesman API also filter on the
+        # write_date of the templates, which hold the product names and prices
+        create_index(self._cr, 'product_template_write_date_index', self._table, ['write_date'])
+
+    def write(self, vals):
+        res = super().write(vals)
+        if PRICE_FIELDS.intersection(vals):
+            self.env['product.pricelist']._salesman_invalidate_prices(self.product_variant_ids.ids)
+        return res
@@ -0,0 +1,120 @@
+from odoo import api, models, tools
+
+
+class SalesmanReferenceResolver(models.AbstractModel):
+    '''Reference data looked up by the salesman API on every request, cached per
+    database until one of the underlying models is written'''
+    _name = 'salesman.reference.resolver'
+    _description = 'Salesman API reference data'
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_default_warehouse(self, company_id):
+        '''returns the (warehouse_id, stock_location_id) used for the company stock'''
+        warehouse = self.env['stock.warehouse'].sudo().search([('company_id', '=', company_id)], limit=1)
+        return warehouse.id, warehouse.lot_stock_id.id
+
+    @api.model
+    @tools.ormcache('journal_id')
+    def _get_inbound_payment_method_line_id(self, journal_id):
+        '''returns the payment method used for the customer payments of the journal'''
+        payment_method = 2
+        if journal_id:
+            journal = self.env['account.journal'].sudo().browse(journal_id)
+            if journal.inbound_payment_method_line_ids:
+                return journal.inbound_payment_method_line_ids[0].id
+            inbound_payment_method = self.env['account.payment.method'].sudo().search(
+                [('code', '=', 'manual'), ('payment_type', '=', 'inbound')], limit=1)
+            if inbound_payment_method:
+                return inbound_payment_method.id
+        return payment_method
+
+    @api.model
+    @tools.ormcache('company_id')
+    def _get_payment_journal_ids(self, company_id):
+        '''returns the ids of the bank and cash journals of the company'''
+        return tuple(self.env['account.journal'].sudo().search(
+            [('company_id', '=', company_id), ('type', 'in', ('bank', 'cash'))]).ids)
+
+
+    @api.model
+    @tools.ormcache('uid', 'company_id')
+    def _get_branch_scope(self, uid, company_id):
+        '''returns the (branch_ids, warehouse_ids) the user works in within the
+        company, branch_ids is None when the user is not restricted to branches
+        (multi.branch not installed or no branch set on the user) and the
+        warehouse is then the default one of the company, the branch fields
+        come from optional modules so they are looked up defensively
+        '''
+        user = self.env['res.users'].sudo().browse(uid)
+        branches = None
+        if 'multi.branch' in self.env:
+            branches = self.env['multi.branch'].sudo()
+            if 'branch_ids' in user._fields:
+                branches |= user.branch_ids
+            if 'branch_id' in user._fields:
+                branches |= user.branch_id
+            if 'company_id' in branches._fields:
+                branches = branches.filtered(lambda branch: branch.company_id.id in (False, company_id))
+        if not branches:
+            warehouse_id, _stock_location_id = self._get_default_warehouse(company_id)
+            return None, (warehouse_id,) if warehouse_id else ()
+        warehouses = self.env['stock.warehouse'].sudo()
+        if 'branch_id' in warehouses._fields:
+            warehouses = warehouses.search([('company_id', '=', company_id), ('branch_id', 'in', branches.ids)])
+        if not warehouses:
+            # a branch without a warehouse of its own ships from the company one
+            warehouse_id, _stock_location_id = self._get_default_warehouse(company_id)
+            warehouses = warehouses.browse(warehouse_id or [])
+        return tuple(branches.ids), tuple(warehouses.ids)
+
+    @api.model
+    def _get_branch_domain(self, model, branch_ids, shared=True):
+        '''restricts the records of model to the branch_ids of the user scope when
+        both have branches, the records without branch are shared by all of them
+        unless shared is False'''
+        if branch_ids is None or 'branch_id' not in model._fields:
+            return []
+        return [('branch_id', 'in', list(branch_ids) + [False] if shared else list(branch_ids))]
+
+
+class SalesmanReferenceMixin(models.AbstractModel):
+    '''Clears the reference data cache when a record of the model changes'''
+    _name = 'salesman.reference.mixin'
+    _description = 'Salesman API reference data invalidation'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['salesman.reference.resolver'].clear_caches()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env['salesman.reference.resolver'].clear_caches()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env['salesman.reference.resolver'].clear_caches()
+        return res
+
+
+class StockWarehouse(models.Model):
+    _name = 'stock.warehouse'
+    _inherit = ['stock.warehouse', 'salesman.reference.mixin']
+
+
+class AccountJournal(models.Model):
+    _name = 'account.journal'
+    _inherit = ['account.journal', 'salesman.reference.mixin']
+
+
+class AccountPaymentMethod(models.Model):
+    _name = 'account.payment.method'
+    _inherit = ['account.payment.method', 'salesman.reference.mixin']
+
+
+class AccountPaymentMethodLine(models.Model):
+    _name = 'account.payment.method.line'
+    _inherit = ['account.payment.method.line', 'salesman.reference.mixin']
@@ -0,0 +1,219 @@
+import re
+import time
+
+from odoo import api, fields, models
+from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+from ..tools import GridIndex, ensure_trgm, ranked_search
+
+# columns matched by the salesman API contact search
+SEARCH_COLUMNS = ['"res_partner"."name"', '"res_partner"."email"', '"res_partner"."phone"']
+
+# normalized phone and email the contact upsert matches partners on, both indexed
+PHONE_KEY = "regexp_replace({table}\"phone\", '\\D', '', 'g')"
+EMAIL_KEY = 'lower({table}"email")'
+
+# {dbname: GridIndex of the geolocated partners}, per worker, brought up to date
+# from the partners written and deleted since its watermark at most every
+# GEO_INDEX_REFRESH_SECONDS, the overlap catches the transactions still running
+partner_geo_indexes = {}
+GEO_INDEX_REFRESH_SECONDS = 10
+GEO_INDEX_WATERMARK_OVERLAP = 60
+
+# API contact keys: partner fields
+CONTACT_FIELDS = {
+    'contact_name': 'name',
+    'address1': 'street',
+    'address2': 'street2',
+    'phone': 'phone',
+    'email': 'email',
+}
+
+
+def normalize_phone(phone):
+    return re.sub(r'\D', '', phone or '') or None
+
+
+def normalize_email(email):
+    return (email or '').strip().lower() or None
+
+
+def _is_changed(field_name, old, new):
+    '''phones and emails only differing by their formatting are left as they are'''
+    if field_name == 'phone':
+        return normalize_phone(old) != normalize_phone(new)
+    if field_name == 'email':
+        return normalize_email(old) != normalize_email(new)
+    return old != new
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def init(self):
+        super().init()
+        # delta syncs of the salesman API filter on write_date
+        create_index(self._cr, 'res_partner_write_date_index', self._table, ['write_date'])
+        if ensure_trgm(self._cr):
+            for column in ('name', 'email', 'phone'):
+                create_index(self._cr, f'res_partner_{column}_trgm_index', self._table,
+                             [f'"{column}" gin_trgm_ops'], method='gin')
+        create_index(self._cr, 'res_partner_salesman_phone_index', self._table, [PHONE_KEY.format(table='')])
+        create_index(self._cr, 'res_partner_salesman_email_index', self._table, [EMAIL_KEY.format(table='')])
+
+    @api.model
+    def _salesman_search(self, term, limit=20, offset=0, domain=()):
+        '''returns the partners matching term on name, email or phone, best matches first'''
+        return self.browse(ranked_search(self, list(domain), term, SEARCH_COLUMNS, limit=limit, offset=offset))
+
+    @api.model
+    def _salesman_geo_index(self):
+        '''returns the grid index of the partner coordinates of the database, loaded
+        on first use then refreshed incrementally from write_date and tombstones
+        '''
+        if 'partner_latitude' not in self._fields:
+            raise ValidationError("Partner geolocation (base_geolocalize) is not installed")
+        index = partner_geo_indexes.setdefault(self.env.cr.dbname, GridIndex())
+        with index.lock:
+            if index.refreshed_at and time.monotonic() - index.refreshed_at < GEO_INDEX_REFRESH_SECONDS:
+                return index
+            partners = self.sudo().with_context(active_test=False)
+            # the first load skips the partners without coordinates, the refreshes
+            # also read them to drop the ones whose coordinates were removed
+            domain = [('active', '=', True), '|', ('partner_latitude', '!=', 0), ('partner_longitude', '!=', 0)]
+            if index.watermark:
+                domain = [('write_date', '>', index.watermark)]
+                for partner_id in self.env['salesman.sync.tombstone']._get_deleted_ids(self._name, index.watermark):
+                    index.remove(partner_id)
+            watermark = fields.Datetime.subtract(fields.Datetime.now(), seconds=GEO_INDEX_WATERMARK_OVERLAP)
+            for partner in partners.search_read(domain, ['active', 'partner_latitude', 'partner_longitude']):
+                if partner['active'] and (partner['partner_latitude'] or partner['partner_longitude']):
+                    index.upsert(partner['id'], partner['partner_latitude'], partner['partner_longitude'])
+                else:
+                    index.remove(partner['id'])
+            index.watermark = watermark
+            index.refreshed_at = time.monotonic()
+        return index
+
+    @api.model
+    def _salesman_nearby(self, latitude, longitude, limit=20, radius_km=None, domain=()):
+        '''returns the [(distance_km, partner)] of the partners nearest to the
+        point the user can read among those matching domain, closest first
+        the candidates of the index are checked against the access rules batch
+        by batch until enough of them are readable
+        '''
+        index = self._salesman_geo_index()
+        result, rejected = [], set()
+        while len(result) < limit:
+            candidates = index.nearest(latitude, longitude, (limit - len(result)) * 2, radius_km=radius_km,
+                                       exclude=rejected | {partner.id for _distance, partner in result})
+            if not candidates:
+                break
+            readable = set(self.search([('id', 'in', [key for _distance, key in candidates])] + list(domain)).ids)
+            for distance, key in candidates:
+                if key in readable:
+                    result.append((distance, self.browse(key)))
+                else:
+                    rejected.add(key)
+        return sorted(result, key=lambda item: item[0])[:limit]
+
+    @api.model
+    def _salesman_upsert(self, contacts, domain=()):
+        '''creates or updates the contacts of the payload, matching them to the
+        existing partners of domain by normalized phone or email in a single query
+        the contacts of the batch sharing a phone or email are collapsed into one
+        returns one result per contact, in the order of the payload
+        '''
+        results = [None] * len(contacts)
+        # collapse the contacts of the batch sharing a phone or an email
+        groups, group_of_key = [], {}
+        for index, contact in enumerate(contacts):
+            if not isinstance(contact, dict) or not contact.get('contact_name') \
+                    or not (contact.get('phone') or contact.get('email')):
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'message': 'Please provide the contact name and a phone or an email',
+                }
+                continue
+            keys = {('phone', normalize_phone(contact.get('phone'))), ('email', normalize_email(contact.get('email')))}
+            keys = {key for key in keys if key[1]}
+            group = next((group_of_key[key] for key in keys if key in group_of_key), None)
+            if group is None:
+                group = {'indexes': [], 'keys': set(), 'vals': {}}
+                groups.append(group)
+            for other in {id(group_of_key[key]): group_of_key[key] for key in keys if key in group_of_key}.values():
+                if other is not group:
+                    group['indexes'] += other['indexes']
+                    group['keys'] |= other['keys']
+                    group['vals'] = dict(other['vals'], **group['vals'])
+                    groups.remove(other)
+            group['indexes'].append(index)
+            group['keys'] |= keys
+            for contact_key, field_name in CONTACT_FIELDS.items():
+                if contact.get(contact_key):
+                    group['vals'].setdefault(field_name, contact[contact_key])
+            for key in group['keys']:
+                group_of_key[key] = group
+
+        # match every group against the existing partners with one query
+        existing_of_key = {}
+        if groups:
+            phones = [key[1] for key in group_of_key if key[0] == 'phone']
+            emails = [key[1] for key in group_of_key if key[0] == 'email']
+            query = self._where_calc(list(domain))
+            self._apply_ir_rules(query, 'read')
+            from_clause, where_clause, where_params = query.get_sql()
+            phone_key, email_key = PHONE_KEY.format(table='"res_partner".'), EMAIL_KEY.format(table='"res_partner".')
+            self.env.cr.execute(f"""
+                SELECT "res_partner".id, {phone_key}, {email_key}
+                  FROM {from_clause}
+                 WHERE {where_clause or 'TRUE'}
+                   AND ({phone_key} = ANY(%s) OR {email_key} = ANY(%s))
+              ORDER BY "res_partner".id
+            """, where_params + [phones, emails])
+            for partner_id, phone, email in self.env.cr.fetchall():
+                for key in (('phone', phone), ('email', email)):
+                    if key[1]:
+                        existing_of_key.setdefault(key, partner_id)
+
+        to_create, to_update = [], {}
+        for group in groups:
+            partner_id = min(
+                (existing_of_key[key] for key in group['keys'] if key in existing_of_key), default=None)
+            if partner_id:
+                to_update.setdefault(partner_id, []).append(group)
+            else:
+                to_create.append(group)
+
+        # write the changed values, the partners getting the same values together
+        partners = self.browse(list(to_update))
+        current = {rec['id']: rec for rec in partners.read(list(CONTACT_FIELDS.values()))}
+        partners_by_vals = {}
+        for partner_id, partner_groups in to_update.items():
+            vals = {}
+            for group in partner_groups:
+                for field_name, value in group['vals'].items():
+                    vals.setdefault(field_name, value)
+            vals = {key: value for key, value in vals.items() if _is_changed(key, current[partner_id][key], value)}
+            if vals:
+                partners_by_vals.setdefault(tuple(sorted(vals.items())), []).append(partner_id)
+            for group in partner_groups:
+                for index in group['indexes']:
+                    results[index] = {'index': index, 'success': True, 'id': partner_id,
+                                      'status': 'updated' if vals else 'unchanged'}
+        for vals, partner_ids in partners_by_vals.items():
+            self.browse(partner_ids).write(dict(vals))
+
+        created = self.create([group['vals'] for group in to_create])
+        for group, partner in zip(to_create, created):
+            for index in group['indexes']:
+                results[index] = {'index': index, 'success': True, 'id': partner.id, 'status': 'created'}
+        return results
+
+    def unlink(self):
+        res_ids = self.ids
+        res = super().unlink()
+        self.env['salesman.sync.tombstone']._record_deletion(self._name, res_ids)
+        return res
@@ -0,0 +1,41 @@
+from odoo import api, models
+from odoo.tools.sql import create_index
+
+from ..tools import ensure_trgm, ranked_search
+
+# columns matched by the salesman API user search, on the joined partner
+SEARCH_COLUMNS = [
+    '"salesman_partner"."name"', '"res_users"."login"',
+    '"salesman_partner"."email"', '"salesman_partner"."phone"',
+]
+SEARCH_JOIN = 'JOIN "res_partner" AS "salesman_partner" ON "salesman_partner".id = "res_users".partner_id'
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    def init(self):
+        super().init()
+        # delta syncs of the salesman API filter on write_date
+        create_index(self._cr, 'res_users_write_date_index', self._table, ['write_date'])
+        if ensure_trgm(self._cr):
+            create_index(self._cr, 'res_users_login_trgm_index', self._table, ['"login" gin_trgm_ops'], method='gin')
+
+    @api.model
+    def _salesman_search(self, term, limit=20, offset=0, domain=()):
+        '''returns the users matching term on name, login, email or phone, best matches first'''
+        return self.browse(ranked_search(
+            self, list(domain), term, SEARCH_COLUMNS, join=SEARCH_JOIN, limit=limit, offset=offset))
+
+    def write(self, vals):
+        res = super().write(vals)
+        # the branches of the users scope the salesman API
+        if 'branch_id' in vals or 'branch_ids' in vals:
+            self.env['salesman.reference.resolver'].clear_caches()
+        return res
+
+    def unlink(self):
+        res_ids = self.ids
+        res = super().unlink()
+        self.env['salesman.sync.tombstone']._record_deletion(self._name, res_ids)
+        return res
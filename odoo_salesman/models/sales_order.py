@@ -1,4 +1,129 @@
-from odoo import models, fields
+import logging
+from collections import defaultdict
+
+from odoo import api, models
+from odoo.exceptions import ValidationError
+
+_logger = logging.getLogger(__name__)
+
 
 class SaleOrder(models.Model):
     _inherit = 'sale.order'
+
+    def write(self, vals):
+        if 'date_order' in vals:
+            # the sales rollup of the day the orders leave is recomputed
+            self.env['salesman.sales.rollup.day']._record_days(self)
+        return super().write(vals)
+
+    def unlink(self):
+        self.env['salesman.sales.rollup.day']._record_days(self)
+        return super().unlink()
+
+    @api.model
+    def _salesman_prepare_order_vals(self, data):
+        '''where data is equal to one order of the sent payload'''
+        order_vals = {
+            'partner_id': data.get('partner_id'),
+            'order_line': [(0, 0, line) for line in data.get('order_lines')]
+        }
+        if data.get('company_id'):
+            order_vals['company_id'] = data['company_id']
+        return order_vals
+
+    def _salesman_order_line_commands(self, order_lines, replace=False):
+        '''diffs the payload lines against the lines of the order in memory
+        a payload line with an id updates that line, otherwise it updates the
+        next unmatched line of its product or creates a new one, with replace
+        the unmatched product lines are removed
+        returns the commands to write on order_line in a single write
+        '''
+        self.ensure_one()
+        existing_lines = self.order_line
+        line_ids = set(existing_lines.ids)
+        explicit_ids = {line['id'] for line in order_lines if line.get('id')}
+        unknown_ids = explicit_ids - line_ids
+        if unknown_ids:
+            raise ValidationError(
+                f"Sales order lines {', '.join(map(str, sorted(unknown_ids)))} do not belong to {self.name}")
+
+        lines_by_product = defaultdict(list)
+        for line in existing_lines:
+            if line.id not in explicit_ids and not line.display_type:
+                lines_by_product[line.product_id.id].append(line.id)
+        for line_ids_of_product in lines_by_product.values():
+            line_ids_of_product.reverse()
+
+        matched_ids = set(explicit_ids)
+        commands = []
+        for line in order_lines:
+            vals = dict(line)
+            line_id = vals.pop('id', None)
+            if not line_id and lines_by_product.get(vals.get('product_id')):
+                line_id = lines_by_product[vals['product_id']].pop()
+                matched_ids.add(line_id)
+            commands.append((1, line_id, vals) if line_id else (0, 0, vals))
+        if replace:
+            commands += [
+                (2, line.id) for line in existing_lines
+                if line.id not in matched_ids and not line.display_type
+            ]
+        return commands
+
+    @api.model
+    def _salesman_create_confirm_invoice(self, vals_list):
+        '''creates the orders with a single create, confirms them together and
+        invoices them with one _create_invoices call (an invoice per order)
+        returns the orders in the order of vals_list
+        '''
+        orders = self.create(vals_list)
+        orders.action_confirm()
+        orders._create_invoices(grouped=True)
+        return orders
+
+    @api.model
+    def _salesman_bulk_create(self, orders_data):
+        '''creates, confirms and invoices the orders of the payload in batch,
+        when the batch fails every order is retried in its own savepoint so
+        a bad order only gets an error entry
+        returns one result per order, in the order of the payload
+        '''
+        results = [None] * len(orders_data)
+        pending = []
+        for index, data in enumerate(orders_data):
+            if not isinstance(data, dict) or not data.get('partner_id') or not data.get('order_lines'):
+                results[index] = {
+                    'index': index,
+                    'success': False,
+                    'message': 'Missing required parameters [partner_id, order_lines]',
+                }
+            else:
+                pending.append((index, self._salesman_prepare_order_vals(data)))
+        if not pending:
+            return results
+
+        created = []
+        try:
+            with self.env.cr.savepoint():
+                orders = self._salesman_create_confirm_invoice([vals for _index, vals in pending])
+            created = list(zip([index for index, _vals in pending], orders))
+        except Exception as e:
+            _logger.info("Bulk creation of %s sales orders failed (%s), retrying order by order", len(pending), e)
+            for index, vals in pending:
+                try:
+                    with self.env.cr.savepoint():
+                        order = self._salesman_create_confirm_invoice([vals])
+                    created.append((index, order))
+                except Exception as e:
+                    results[index] = {'index': index, 'success': False, 'message': str(e)}
+
+        for index, order in created:
+            inv = order.invoice_ids[:1]
+            results[index] = {
+                'index': index,
+                'success': True,
+                'so_id': order.id,
+                'so_number': order.name,
+                'invoice_id': inv.id or None,
+            }
+        return results
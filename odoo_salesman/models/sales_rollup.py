@@ -0,0 +1,190 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from odoo import api, fields, models
+from odoo.tools.sql import column_exists, create_index
+
+_logger = logging.getLogger(__name__)
+
+# the orders written by transactions still running when the rollup is
+# refreshed are picked up again by the next refresh
+ROLLUP_WATERMARK_OVERLAP = 60
+WATERMARK_PARAM = 'odoo_salesman.sales_rollup_watermark'
+
+SUMMARY_GROUP_BY = {
+    'day': 'date',
+    'user': 'user_id',
+    'branch': 'branch_id',
+    'product': 'product_id',
+}
+
+
+class SalesmanSalesRollupDay(models.Model):
+    '''Days an order left, moving its date or deleted, the rollup of which the
+    next refresh recomputes since no order written after the watermark is on
+    them anymore'''
+    _name = 'salesman.sales.rollup.day'
+    _description = 'Salesman API sales rollup day to refresh'
+    _log_access = False
+
+    date = fields.Date(required=True)
+
+    @api.model
+    def _record_days(self, orders):
+        days = {order.date_order.date() for order in orders if order.state in ('sale', 'done') and order.date_order}
+        if days:
+            self.sudo().create([{'date': day} for day in days])
+
+
+class SalesmanSalesRollup(models.Model):
+    '''Confirmed sales aggregated per day, company, salesman, branch and product,
+    the rows without product hold the totals of the orders of the day so their
+    order_count is not counted once per product'''
+    _name = 'salesman.sales.rollup'
+    _description = 'Salesman API daily sales rollup'
+    _log_access = False
+
+    date = fields.Date(required=True)
+    company_id = fields.Many2one('res.company', ondelete='cascade')
+    user_id = fields.Many2one('res.users', ondelete='set null')
+    # multi.branch is optional, the column is only filled when sale_order has one
+    branch_id = fields.Integer()
+    product_id = fields.Many2one('product.product', ondelete='cascade')
+    order_count = fields.Integer()
+    qty = fields.Float()
+    amount_untaxed = fields.Float()
+    amount_total = fields.Float()
+
+    def init(self):
+        create_index(self._cr, 'salesman_sales_rollup_date_index', self._table, ['date', 'company_id'])
+
+    @api.model
+    def _salesman_refresh(self):
+        '''recomputes the days of the orders written since the last refresh and
+        the days orders left, all the days the first time, amounts are converted
+        to the company currency like sale.report and the days are the UTC dates
+        of the orders
+        '''
+        self.env['sale.order'].flush_model()
+        self.env['sale.order.line'].flush_model()
+        params = self.env['ir.config_parameter'].sudo()
+        watermark = params.get_param(WATERMARK_PARAM)
+        self.env.cr.execute("SELECT (now() AT TIME ZONE 'UTC')")
+        now = self.env.cr.fetchone()[0]
+        new_watermark = fields.Datetime.to_string(now - timedelta(seconds=ROLLUP_WATERMARK_OVERLAP))
+        left_days = self.env['salesman.sales.rollup.day'].sudo().search([])
+        if watermark:
+            self.env.cr.execute(
+                "SELECT DISTINCT date_order::date FROM sale_order WHERE write_date > %s", [watermark])
+            days = list({row[0] for row in self.env.cr.fetchall()} | set(left_days.mapped('date')))
+            left_days.unlink()
+            if not days:
+                params.set_param(WATERMARK_PARAM, new_watermark)
+                return
+            self.env.cr.execute("DELETE FROM salesman_sales_rollup WHERE date = ANY(%s)", [days])
+            day_filter, day_params = "AND so.date_order::date = ANY(%s)", [days]
+        else:
+            left_days.unlink()
+            self.env.cr.execute("DELETE FROM salesman_sales_rollup")
+            days, day_filter, day_params = None, "", []
+        branch = 'so.branch_id' if column_exists(self.env.cr, 'sale_order', 'branch_id') else 'NULL::int'
+        self.env.cr.execute(f"""
+            INSERT INTO salesman_sales_rollup (
+                date, company_id, user_id, branch_id, product_id,
+                order_count, qty, amount_untaxed, amount_total)
+            SELECT so.date_order::date, so.company_id, so.user_id, {branch}, sol.product_id,
+                   COUNT(DISTINCT so.id), SUM(sol.product_uom_qty),
+                   SUM(sol.price_subtotal / COALESCE(NULLIF(so.currency_rate, 0), 1.0)),
+                   SUM(sol.price_total / COALESCE(NULLIF(so.currency_rate, 0), 1.0))
+              FROM sale_order_line sol
+              JOIN sale_order so ON so.id = sol.order_id
+             WHERE so.state IN ('sale', 'done') AND sol.display_type IS NULL {day_filter}
+          GROUP BY GROUPING SETS (
+                (so.date_order::date, so.company_id, so.user_id, {branch}, sol.product_id),
+                (so.date_order::date, so.company_id, so.user_id, {branch}))
+        """, day_params)
+        _logger.info("Refreshed the sales rollup of %s days", len(days) if days else 'all')
+        params.set_param(WATERMARK_PARAM, new_watermark)
+
+    @api.model
+    def _salesman_summary(self, date_from, date_to, group_by, user_ids=None, branch_ids=None,
+                          product_ids=None):
+        '''returns the sales between the two dates grouped by group_by, a list of
+        day, user, branch and product, from the rollup for the past days and
+        from sale.report for today, which the rollup may not hold yet
+        filtering on product_ids reads the rows per product of the rollup, an
+        order of the past days holding several of the products is then counted
+        once per product in order_count
+        '''
+        today = fields.Date.context_today(self.with_context(tz='UTC'))
+        by_product = 'product' in group_by or bool(product_ids)
+        columns = [SUMMARY_GROUP_BY[key] for key in group_by]
+        rows = []
+        if date_from < today:
+            where = ["date BETWEEN %s AND %s", "company_id = ANY(%s)",
+                     "product_id IS NOT NULL" if by_product else "product_id IS NULL"]
+            where_params = [date_from, min(date_to, today - timedelta(days=1)), self.env.companies.ids]
+            for column, ids in [('user_id', user_ids), ('branch_id', branch_ids), ('product_id', product_ids)]:
+                if ids:
+                    where.append(f"{column} = ANY(%s)")
+                    where_params.append(ids)
+            select = ', '.join(columns + [
+                'SUM(order_count)', 'SUM(qty)', 'SUM(amount_untaxed)', 'SUM(amount_total)'])
+            self.env.cr.execute(f"""
+                SELECT {select}
+                  FROM salesman_sales_rollup
+                 WHERE {' AND '.join(where)}
+                {'GROUP BY ' + ', '.join(columns) if columns else ''}
+                {'ORDER BY ' + ', '.join(columns) if columns else ''}
+            """, where_params)
+            for row in self.env.cr.fetchall():
+                values = dict(zip(columns, row))
+                values.update(zip(['order_count', 'qty', 'amount_untaxed', 'amount_total'], row[len(columns):]))
+                rows.append(values)
+        if date_to >= today:
+            rows += self._salesman_live_summary(today, columns, user_ids, branch_ids, product_ids)
+        # today adds up to the past days when the summary is not grouped by day
+        summary = {}
+        for row in rows:
+            key = tuple(row.get(column) for column in columns)
+            totals = summary.setdefault(key, dict(
+                zip(columns, key), order_count=0, qty=0.0, amount_untaxed=0.0, amount_total=0.0))
+            for measure in ('order_count', 'qty', 'amount_untaxed', 'amount_total'):
+                totals[measure] += row[measure] or 0
+        return list(summary.values())
+
+    @api.model
+    def _salesman_live_summary(self, today, columns, user_ids, branch_ids, product_ids):
+        report = self.env['sale.report'].with_context(tz='UTC')
+        has_branch = 'branch_id' in report._fields
+        domain = [
+            ('date', '>=', datetime.combine(today, time.min)),
+            ('state', 'in', ('sale', 'done')),
+            ('company_id', 'in', self.env.companies.ids),
+        ]
+        if user_ids:
+            domain.append(('user_id', 'in', user_ids))
+        if product_ids:
+            domain.append(('product_id', 'in', product_ids))
+        if branch_ids:
+            if not has_branch:
+                return []
+            domain.append(('branch_id', 'in', branch_ids))
+        groupby = [column for column in columns
+                   if column != 'date' and (column != 'branch_id' or has_branch)]
+        groups = report.read_group(
+            domain, ['product_uom_qty:sum', 'price_subtotal:sum', 'price_total:sum', 'name:count_distinct'],
+            groupby, lazy=False)
+        rows = []
+        for group in groups:
+            row = {column: group[column][0] if isinstance(group[column], tuple) else group[column] or None
+                   for column in groupby}
+            row.update(
+                date=today,
+                order_count=group['name'],
+                qty=group['product_uom_qty'],
+                amount_untaxed=group['price_subtotal'],
+                amount_total=group['price_total'],
+            )
+            rows.append(row)
+        return rows
@@ -0,0 +1,10 @@
+from odoo import models
+
+
+class StockMove(models.Model):
+    _inherit = 'stock.move'
+
+    def _action_done(self, cancel_backorder=False):
+        moves = super()._action_done(cancel_backorder=cancel_backorder)
+        self.env['stock.quant']._salesman_invalidate_availability(moves.product_id.ids)
+        return moves
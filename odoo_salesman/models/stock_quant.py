@@ -0,0 +1,95 @@
+from odoo import api, models
+
+from ..tools import TTLCache
+
+# seconds a computed availability is served from the cache, the
+# odoo_salesman.availability_cache_ttl parameter overrides it (0 disables the cache)
+AVAILABILITY_CACHE_TTL = 10
+
+# {(dbname, company_id, location_id, product_id): available quantity}, per worker
+availability_cache = TTLCache(maxsize=50000)
+
+
+class StockQuant(models.Model):
+    _inherit = 'stock.quant'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        quants = super().create(vals_list)
+        self._salesman_invalidate_availability(quants.product_id.ids)
+        return quants
+
+    def write(self, vals):
+        self._salesman_invalidate_availability(self.product_id.ids)
+        res = super().write(vals)
+        if 'product_id' in vals:
+            self._salesman_invalidate_availability(self.product_id.ids)
+        return res
+
+    def unlink(self):
+        self._salesman_invalidate_availability(self.product_id.ids)
+        return super().unlink()
+
+    @api.model
+    def _salesman_invalidate_availability(self, product_ids):
+        '''drops the cached availabilities of the products, again once the
+        transaction is committed so no other request caches the old stock meanwhile
+        '''
+        if not product_ids:
+            return
+        tags = [(self.env.cr.dbname, product_id) for product_id in product_ids]
+        availability_cache.invalidate_tags(tags)
+        self.env.cr.postcommit.add(lambda: availability_cache.invalidate_tags(tags))
+
+    @api.model
+    def _salesman_get_available_quantities(self, products, warehouses, use_cache=True):
+        '''returns the available quantity of every product in the stock location
+        of every warehouse as {(product_id, warehouse_id): quantity}
+        computed like _get_available_quantity without negative stock, the
+        products missing from the cache are computed by one grouped query
+        '''
+        if not products or not warehouses:
+            return {}
+        ttl = 0
+        if use_cache:
+            ttl = int(self.env['ir.config_parameter'].sudo().get_param(
+                'odoo_salesman.availability_cache_ttl', AVAILABILITY_CACHE_TTL))
+        dbname = self.env.cr.dbname
+        cache_keys = {
+            (product.id, wh.id): (dbname, wh.company_id.id, wh.lot_stock_id.id, product.id)
+            for product in products for wh in warehouses
+        }
+        quantities = {}
+        if ttl > 0:
+            for key, cache_key in cache_keys.items():
+                qty = availability_cache.get(cache_key)
+                if qty is not None:
+                    quantities[key] = qty
+        missing_products = products.filtered(
+            lambda prd: any((prd.id, wh.id) not in quantities for wh in warehouses))
+        if not missing_products:
+            return quantities
+
+        computed = dict.fromkeys(
+            [(product.id, wh.id) for product in missing_products for wh in warehouses], 0.0)
+        groups = self.sudo().read_group(
+            [('product_id', 'in', missing_products.ids),
+             ('location_id', 'child_of', warehouses.mapped('lot_stock_id').ids)],
+            ['quantity:sum', 'reserved_quantity:sum'],
+            ['product_id', 'location_id'],
+            lazy=False,
+        )
+        locations = self.env['stock.location'].sudo().browse(
+            {group['location_id'][0] for group in groups})
+        location_paths = {loc.id: loc.parent_path for loc in locations}
+        for group in groups:
+            path = location_paths[group['location_id'][0]]
+            for wh in warehouses:
+                if path.startswith(wh.lot_stock_id.parent_path):
+                    key = (group['product_id'][0], wh.id)
+                    computed[key] += group['quantity'] - group['reserved_quantity']
+        for key, qty in computed.items():
+            quantities[key] = max(qty, 0.0)
+            if ttl > 0:
+                availability_cache.set(cache_keys[key], quantities[key], ttl, tags=[(dbname, key[0])])
+        return quantities
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import logging
+
+from odoo import api, fields, models
+
+from ..tools.payload import dumps
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_logger = logging.getLogger(__name__)
+
+# reference data of a bundle: key: (model, domain, fields), the products are
+# sent with 'sale_price' like /api/get-product
+BUNDLE_MODELS = {
+    'products': ('product.product', [('sale_ok', '=', True)],
+                 ['name', 'list_price', 'default_code', 'barcode', 'uom_id', 'categ_id', 'detailed_type', 'taxes_id']),
+    'pricelists': ('product.pricelist', [], ['name', 'currency_id', 'discount_policy']),
+    'pricelist_items': ('product.pricelist.item', [], [
+        'pricelist_id', 'applied_on', 'product_id', 'product_tmpl_id', 'categ_id', 'min_quantity',
+        'compute_price', 'fixed_price', 'percent_price', 'date_start', 'date_end']),
+    'branches': ('multi.branch', [], ['name']),
+    'contacts': ('res.partner', [], ['name', 'street', 'street2', 'phone', 'email']),
+    'users': ('res.users', [('share', '=', False)], ['name']),
+}
+# bundles restricted to the branches of the salesman like the API endpoints
+BRANCH_SCOPED_BUNDLES = ['products', 'contacts']
+BUNDLE_FIELD_ALIASES = {
+    'list_price': 'sale_price',
+    'name': {'contacts': 'contact_name', 'users': 'user_name'},
+    'street': 'address1',
+    'street2': 'address2',
+}
+
+
+class SalesmanSyncBundle(models.Model):
+    '''Compressed snapshot of the reference data a salesman needs offline, one
+    per company and branch scope shared by the salesmen working in it, rebuilt
+    by a cron and served as a file'''
+    _name = 'salesman.sync.bundle'
+    _description = 'Salesman API offline sync bundle'
+
+    company_id = fields.Many2one('res.company', required=True, ondelete='cascade')
+    # the sorted branch ids of the salesmen joined by '-', 'all' when unrestricted
+    scope_key = fields.Char(required=True)
+    version = fields.Integer(required=True, default=0)
+    checksum = fields.Char(required=True)
+    encoding = fields.Selection([('gzip', 'gzip'), ('zstd', 'zstd')], required=True)
+    attachment_id = fields.Many2one('ir.attachment', ondelete='set null')
+    built_at = fields.Datetime(required=True)
+
+    _sql_constraints = [
+        ('company_scope_uniq', 'unique(company_id, scope_key)', 'A branch scope has one sync bundle per company.'),
+    ]
+
+    @api.model
+    def _salesman_get_salesmen(self):
+        return self.env.ref('sales_team.group_sale_salesman').sudo().users.filtered(
+            lambda usr: usr.active and not usr.share)
+
+    @api.model
+    def _salesman_scope_key(self, branch_ids):
+        if branch_ids is None:
+            return 'all'
+        return '-'.join(str(branch_id) for branch_id in sorted(branch_ids))
+
+    @api.model
+    def _salesman_build_bundles(self, auto_commit=False):
+        '''rebuilds once the bundle of every branch scope the salesmen work in,
+        in each of their companies, the salesmen with the same branches share
+        it, a bundle whose content did not change keeps its version and file
+        '''
+        resolver = self.env['salesman.reference.resolver']
+        scopes = {}
+        for user in self._salesman_get_salesmen():
+            for company in user.company_ids:
+                branch_ids, _warehouse_ids = resolver._get_branch_scope(user.id, company.id)
+                scopes.setdefault((company, self._salesman_scope_key(branch_ids)), user)
+        for (company, scope_key), user in scopes.items():
+            try:
+                self._salesman_build_bundle(company, user)
+            except Exception:
+                _logger.exception("Failed to build the sync bundle of the scope %s in %s", scope_key, company.name)
+                if not auto_commit:
+                    raise
+                self.env.cr.rollback()
+                continue
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+
+    @api.model
+    def _salesman_build_bundle(self, company, user):
+        '''reads the data as the salesman in the company so the bundle only holds
+        what the salesman is allowed to see, within the branches of the salesman,
+        the bundle is served to every salesman with the same branches'''
+        env = self.with_user(user).with_context(allowed_company_ids=[company.id]).env
+        resolver = self.env['salesman.reference.resolver']
+        branch_ids, _warehouse_ids = resolver._get_branch_scope(user.id, company.id)
+        scope_key = self._salesman_scope_key(branch_ids)
+        content = {}
+        for key, (model_name, domain, field_names) in BUNDLE_MODELS.items():
+            if model_name not in env:
+                continue
+            if key in BRANCH_SCOPED_BUNDLES:
+                domain = domain + resolver._get_branch_domain(env[model_name], branch_ids)
+            elif key == 'branches' and branch_ids is not None:
+                domain = domain + [('id', 'in', list(branch_ids))]
+            rows = env[model_name].search_read(domain, field_names, order='id', load=None)
+            content[key] = [self._salesman_alias_row(key, row) for row in rows]
+        raw = dumps(content, sort_keys=True)
+        checksum = hashlib.sha256(raw).hexdigest()
+
+        bundle = self.sudo().search([('company_id', '=', company.id), ('scope_key', '=', scope_key)])
+        if bundle and bundle.checksum == checksum and bundle.attachment_id:
+            return bundle
+        version = bundle.version + 1 if bundle else 1
+        now = fields.Datetime.now()
+        raw = dumps({
+            'version': version,
+            'company_id': company.id,
+            'branch_ids': sorted(branch_ids) if branch_ids is not None else None,
+            'generated_at': now,
+            **content,
+        })
+        if zstandard is not None:
+            encoding, data = 'zstd', zstandard.ZstdCompressor(level=10).compress(raw)
+        else:
+            encoding, data = 'gzip', gzip.compress(raw, compresslevel=6)
+        vals = {
+            'company_id': company.id,
+            'scope_key': scope_key,
+            'version': version,
+            'checksum': checksum,
+            'encoding': encoding,
+            'built_at': now,
+        }
+        if not bundle:
+            bundle = self.sudo().create(vals)
+        else:
+            bundle.write(vals)
+        old_attachment = bundle.attachment_id
+        bundle.attachment_id = self.env['ir.attachment'].sudo().create({
+            'name': f"salesman_bundle_{company.id}_{scope_key}_v{version}.json.{'zst' if encoding == 'zstd' else 'gz'}",
+            'raw': data,
+            'mimetype': 'application/zstd' if encoding == 'zstd' else 'application/gzip',
+            'res_model': self._name,
+            'res_id': bundle.id,
+        })
+        old_attachment.unlink()
+        _logger.info("Built version %s of the sync bundle of the scope %s in %s (%s bytes)",
+                     version, scope_key, company.name, len(data))
+        return bundle
+
+    @api.model
+    def _salesman_alias_row(self, key, row):
+        aliased = {}
+        for name, value in row.items():
+            alias = BUNDLE_FIELD_ALIASES.get(name, name)
+            if isinstance(alias, dict):
+                alias = alias.get(key, name)
+            aliased[alias] = value
+        return aliased
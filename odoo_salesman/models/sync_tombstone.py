@@ -0,0 +1,37 @@
+from odoo import api, fields, models
+from odoo.tools.sql import create_index
+
+# deletions older than this are no longer reported to the devices
+TOMBSTONE_RETENTION_DAYS = 90
+
+
+class SalesmanSyncTombstone(models.Model):
+    _name = 'salesman.sync.tombstone'
+    _description = 'Salesman API deleted records'
+    _order = 'id'
+
+    res_model = fields.Char(required=True)
+    res_id = fields.Integer(required=True)
+    deleted_on = fields.Datetime(required=True, default=fields.Datetime.now)
+
+    def init(self):
+        create_index(self._cr, 'salesman_sync_tombstone_model_deleted_on_index',
+                     self._table, ['res_model', 'deleted_on'])
+
+    @api.model
+    def _record_deletion(self, model_name, res_ids):
+        '''keeps track of the deleted ids so delta syncs can report them'''
+        if res_ids:
+            self.sudo().create([{'res_model': model_name, 'res_id': res_id} for res_id in res_ids])
+
+    @api.model
+    def _get_deleted_ids(self, model_name, since):
+        '''returns the ids of model_name deleted after the since watermark'''
+        tombstones = self.sudo().search_read(
+            [('res_model', '=', model_name), ('deleted_on', '>', since)], ['res_id'])
+        return [tombstone['res_id'] for tombstone in tombstones]
+
+    @api.autovacuum
+    def _gc_tombstones(self):
+        limit_date = fields.Datetime.subtract(fields.Datetime.now(), days=TOMBSTONE_RETENTION_DAYS)
+        self.sudo().search([('deleted_on', '<', limit_date)]).unlink()
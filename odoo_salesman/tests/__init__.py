@@ -1 +1,22 @@
-from . import test_sales_order_side
\ No newline at end of file
+from . import test_sales_order
+from . import test_sales_order_side
+from . import test_stock_availability
+from . import test_sales_order_bulk
+from . import test_idempotency_key
+from . import test_order_job
+from . import test_sales_order_lines
+from . import test_contact_upsert
+from . import test_benchmark
+from . import test_pricing
+from . import test_sync_bundle
+from . import test_payload
+from . import test_sales_rollup
+from . import test_customer_statement
+from . import test_branch_scope
+from . import test_nearby_contacts
+from . import test_product_api
+from . import test_delta_sync
+from . import test_invoice_validation
+from . import test_search
+from . import test_export
+from . import test_metrics
@@ -0,0 +1,172 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from odoo.tests import HttpCase, tagged
+
+from ..tools import metrics
+
+_logger = logging.getLogger(__name__)
+
+# size of the seeded dataset, override through the environment
+N_PRODUCTS = int(os.environ.get('SALESMAN_BENCH_PRODUCTS', 200))
+N_PARTNERS = int(os.environ.get('SALESMAN_BENCH_PARTNERS', 200))
+N_ORDERS = int(os.environ.get('SALESMAN_BENCH_ORDERS', 20))
+N_LINES = int(os.environ.get('SALESMAN_BENCH_LINES', 10))
+# results of the run, compare the files of two runs to spot regressions
+OUTPUT = os.environ.get('SALESMAN_BENCH_OUTPUT', os.path.join(tempfile.gettempdir(), 'salesman_bench.json'))
+
+# SQL queries allowed per benchmark: (fixed, per row) where the rows are the
+# products, order lines or invoices the request processes, a query count
+# growing per record read (N+1) exceeds the fixed part of the read budgets
+QUERY_BUDGETS = {
+    'get_products': (10, 0),
+    'get_products_fields': (10, 0),
+    'availability_batch': (15, 0),
+    'get_sales_order': (10, 0),
+    'list_sales_orders': (12, 0),
+    'update_sales_order': (60, 3),
+    'create_sales_order': (250, 20),
+    'bulk_create_sales_orders': (400, 15),
+    'invoice_validation_batch': (150, 10),
+}
+
+
+@tagged('post_install', '-at_install', 'salesman_bench')
+class TestSalesmanBenchmark(HttpCase):
+    '''measures the latency, SQL queries and memory of the API endpoints on a
+    seeded dataset and fails when an endpoint exceeds its query budget'''
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestSalesmanBenchmark, cls).setUpClass()
+        cls.results = {}
+        env = cls.env
+        cls.warehouse = env['stock.warehouse'].search([('company_id', '=', env.company.id)], limit=1)
+        cls.products = env['product.product'].create([{
+            'name': f'Bench Product {index}',
+            'list_price': 10.0 + index,
+            'detailed_type': 'product',
+            'invoice_policy': 'order',
+        } for index in range(N_PRODUCTS)])
+        for product in cls.products:
+            env['stock.quant']._update_available_quantity(product, cls.warehouse.lot_stock_id, 1000.0)
+        cls.partners = env['res.partner'].create([{
+            'name': f'Bench Outlet {index}',
+            'phone': f'0800{index:07d}',
+            'email': f'outlet{index}@example.com',
+        } for index in range(N_PARTNERS)])
+        cls.orders = env['sale.order'].create([{
+            'partner_id': cls.partners[index % N_PARTNERS].id,
+            'order_line': [(0, 0, {
+                'product_id': cls.products[(index + line) % N_PRODUCTS].id,
+                'product_uom_qty': 1,
+            }) for line in range(N_LINES)],
+        } for index in range(N_ORDERS)])
+
+    @classmethod
+    def tearDownClass(cls):
+        with open(OUTPUT, 'w') as output:
+            json.dump({
+                'dataset': {'products': N_PRODUCTS, 'partners': N_PARTNERS, 'orders': N_ORDERS, 'lines': N_LINES},
+                'results': cls.results,
+            }, output, indent=2, sort_keys=True)
+        _logger.info("Salesman API benchmark results written to %s", OUTPUT)
+        super(TestSalesmanBenchmark, cls).tearDownClass()
+
+    def setUp(self):
+        super(TestSalesmanBenchmark, self).setUp()
+        self.authenticate('admin', 'admin')
+
+    def _bench(self, name, route, url, payload, rows=0, method='POST', operation=''):
+        '''calls the endpoint, records its metrics and checks its query budget'''
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = self.opener.request(
+            method, self.base_url() + url, data=json.dumps(payload),
+            headers={'Content-Type': 'application/json'}, timeout=300)
+        latency = time.perf_counter() - start
+        _current, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        response.raise_for_status()
+        sample = metrics.last_sample(route, operation)
+        fixed, per_row = QUERY_BUDGETS[name]
+        budget = fixed + per_row * rows
+        self.results[name] = dict(sample, latency=latency, peak_memory=peak_memory, rows=rows, query_budget=budget)
+        self.assertLessEqual(
+            sample['query_count'], budget,
+            f"{name} ran {sample['query_count']} queries, its budget is {budget}")
+        result = response.json()
+        self.assertNotIn('error', result)
+        return result['result']
+
+    def test_01_get_products(self):
+        result = self._bench('get_products', 'get_products', '/api/get-product',
+                             {'limit': N_PRODUCTS}, method='GET')
+        self.assertEqual(len(result['data']), N_PRODUCTS)
+
+    def test_02_get_products_fields(self):
+        result = self._bench('get_products_fields', 'get_products', '/api/get-product',
+                             {'limit': N_PRODUCTS, 'fields': ['name', 'sale_price', 'default_code', 'uom_id']},
+                             method='GET')
+        self.assertEqual(len(result['data']), N_PRODUCTS)
+
+    def test_03_availability_batch(self):
+        result = self._bench('availability_batch', 'get_product_availability', '/api/get-product-availability', {
+            'lines': [{'product_id': product.id, 'requesting_qty': 5} for product in self.products],
+            'strict': True,
+        }, method='GET', operation='batch')
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['data']), N_PRODUCTS)
+
+    def test_04_get_sales_order(self):
+        result = self._bench('get_sales_order', 'handle_sales_operations', '/api/sales_order/operation', {
+            'operation': 'get', 'id': self.orders[0].id,
+        }, operation='get')
+        self.assertEqual(len(result['result']['order_line']), N_LINES)
+
+    def test_05_list_sales_orders(self):
+        result = self._bench('list_sales_orders', 'handle_sales_operations', '/api/sales_order/operation', {
+            'operation': 'list', 'ids': self.orders.ids, 'limit': N_ORDERS,
+        }, operation='list')
+        self.assertEqual(len(result['data']), N_ORDERS)
+
+    def test_06_update_sales_order(self):
+        order = self.orders[0]
+        self._bench('update_sales_order', 'handle_sales_operations', '/api/sales_order/operation', {
+            'operation': 'update',
+            'id': order.id,
+            'order_lines': [{'product_id': line.product_id.id, 'product_uom_qty': 2} for line in order.order_line],
+        }, rows=N_LINES, operation='update')
+        self.assertEqual(set(order.order_line.mapped('product_uom_qty')), {2})
+
+    def test_07_create_sales_order(self):
+        result = self._bench('create_sales_order', 'handle_sales_operations', '/api/sales_order/operation', {
+            'operation': 'create',
+            'partner_id': self.partners[0].id,
+            'order_lines': [{'product_id': product.id, 'product_uom_qty': 1} for product in self.products[:N_LINES]],
+        }, rows=N_LINES, operation='create')
+        self.assertTrue(result['success'])
+
+    def test_08_bulk_create_sales_orders(self):
+        result = self._bench('bulk_create_sales_orders', 'handle_sales_operations', '/api/sales_order/operation', {
+            'operation': 'bulk_create',
+            'orders': [{
+                'partner_id': self.partners[index % N_PARTNERS].id,
+                'order_lines': [{'product_id': product.id, 'product_uom_qty': 1} for product in self.products[:N_LINES]],
+            } for index in range(N_ORDERS)],
+        }, rows=N_ORDERS * N_LINES, operation='bulk_create')
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['data']), N_ORDERS)
+
+    def test_09_invoice_validation_batch(self):
+        self.orders.action_confirm()
+        invoices = self.orders._create_invoices(grouped=True)
+        result = self._bench('invoice_validation_batch', 'validate_invoice_api', '/api/v1/invoice-validation', {
+            'invoice_ids': invoices.ids,
+        }, rows=len(invoices), operation='batch')
+        self.assertTrue(result['success'])
+        self.assertEqual(set(invoices.mapped('state')), {'posted'})
@@ -0,0 +1,94 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+from odoo.tests.common import TransactionCase
+
+
+class TestBranchScope(TransactionCase):
+
+    def setUp(self):
+        super(TestBranchScope, self).setUp()
+        self.Resolver = self.env['salesman.reference.resolver']
+        self.warehouse = self.env['stock.warehouse'].search(
+            [('company_id', '=', self.env.company.id)], limit=1)
+
+    def test_unrestricted_user(self):
+        if 'multi.branch' in self.env and ('branch_id' in self.env.user._fields or 'branch_ids' in self.env.user._fields):
+            self.skipTest("the users have branches in this database")
+        branch_ids, warehouse_ids = self.Resolver._get_branch_scope(self.env.uid, self.env.company.id)
+        self.assertIsNone(branch_ids)
+        self.assertEqual(warehouse_ids, (self.warehouse.id,))
+
+    def test_branch_warehouses(self):
+        if 'multi.branch' not in self.env or 'branch_id' not in self.env['stock.warehouse']._fields \
+                or 'branch_id' not in self.env.user._fields:
+            self.skipTest("multi.branch does not scope the warehouses in this database")
+        branch = self.env['multi.branch'].create({'name': 'Scoped Branch'})
+        warehouse = self.env['stock.warehouse'].create({
+            'name': 'Scoped Warehouse', 'code': 'SCWH', 'branch_id': branch.id,
+        })
+        self.Resolver._get_branch_scope(self.env.uid, self.env.company.id)
+        self.env.user.branch_id = branch
+        # the branch change clears the cached scope
+        branch_ids, warehouse_ids = self.Resolver._get_branch_scope(self.env.uid, self.env.company.id)
+        self.assertIn(branch.id, branch_ids)
+        self.assertEqual(warehouse_ids, (warehouse.id,))
+
+    def test_branch_domain(self):
+        Partner = self.env['res.partner']
+        self.assertEqual(self.Resolver._get_branch_domain(Partner, None), [])
+        if 'branch_id' in Partner._fields:
+            self.assertEqual(self.Resolver._get_branch_domain(Partner, (7,)), [('branch_id', 'in', [7, False])])
+            self.assertEqual(self.Resolver._get_branch_domain(Partner, (7,), shared=False), [('branch_id', 'in', [7])])
+        else:
+            self.assertEqual(self.Resolver._get_branch_domain(Partner, (7,)), [])
+
+    def test_scoped_pricing_and_upsert(self):
+        product = self.env['product.product'].create({'name': 'Out of Scope Product', 'list_price': 10.0})
+        pricelist = self.env['product.pricelist'].create({'name': 'Scoped Pricelist'})
+        [line] = pricelist._salesman_get_prices(
+            [{'product_id': product.id, 'product_uom_qty': 1}], use_cache=False,
+            product_domain=[('id', '!=', product.id)])
+        self.assertEqual(line['message'], 'No product found')
+
+        partner = self.env['res.partner'].create({'name': 'Out of Scope Outlet', 'phone': '0800 123 4567'})
+        [result] = self.env['res.partner']._salesman_upsert(
+            [{'contact_name': 'Scoped Outlet', 'phone': '08001234567'}], domain=[('id', '!=', partner.id)])
+        self.assertEqual(result['status'], 'created')
+        self.assertNotEqual(result['id'], partner.id)
+
+
+@tagged('-at_install', 'post_install')
+class TestBranchScopeController(HttpCase):
+
+    def setUp(self):
+        super(TestBranchScopeController, self).setUp()
+        if 'multi.branch' not in self.env or 'branch_id' not in self.env['res.partner']._fields \
+                or 'branch_id' not in self.env.user._fields:
+            self.skipTest("multi.branch does not scope the contacts in this database")
+        self.authenticate('admin', 'admin')
+        branch, other_branch = self.env['multi.branch'].create([
+            {'name': 'Salesman Branch'}, {'name': 'Other Branch'}])
+        self.env.ref('base.user_admin').branch_id = branch
+        self.partner = self.env['res.partner'].create({'name': 'Other Branch Customer', 'branch_id': other_branch.id})
+        self.product = self.env['product.product'].create({'name': 'Scoped Product', 'list_price': 10.0})
+
+    def _call(self, url, data):
+        self.env.flush_all()
+        response = self.url_open(url, data=json.dumps(data), headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
+    def test_out_of_branch_partner(self):
+        lines = [{'product_id': self.product.id, 'product_uom_qty': 1}]
+        result = self._call('/api/v1/customer-statement', {'partner_id': self.partner.id})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], 'No customer found')
+
+        result = self._call('/api/v1/pricing', {'partner_id': self.partner.id, 'lines': lines})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], 'No customer found')
+
+        result = self._call('/api/sales_order/operation', {
+            'operation': 'quote', 'partner_id': self.partner.id, 'order_lines': lines})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], 'No customer found')
@@ -0,0 +1,39 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestContactUpsert(TransactionCase):
+
+    def setUp(self):
+        super(TestContactUpsert, self).setUp()
+        self.partner = self.env['res.partner'].create({
+            'name': 'Peter Maduka',
+            'phone': '0909 299 8888',
+            'email': 'peter@example.com',
+        })
+
+    def test_upsert(self):
+        results = self.env['res.partner']._salesman_upsert([
+            {'contact_name': 'Peter Maduka Sopulu', 'phone': '09092998888'},
+            {'contact_name': 'New Outlet', 'email': 'Outlet@Example.com', 'address1': 'No. 45 Street'},
+            {'contact_name': 'New Outlet Duplicate', 'email': 'outlet@example.com ', 'phone': '+234 801'},
+            {'contact_name': 'Missing Keys'},
+            {'contact_name': 'Peter', 'email': 'PETER@example.com'},
+        ])
+        self.assertEqual([result['success'] for result in results], [True, True, True, False, True])
+        self.assertEqual(results[0]['id'], self.partner.id)
+        self.assertEqual(results[0]['status'], 'updated')
+        self.assertEqual(results[4]['id'], self.partner.id)
+        self.assertEqual(self.partner.name, 'Peter Maduka Sopulu')
+
+        self.assertEqual(results[1]['status'], 'created')
+        self.assertEqual(results[1]['id'], results[2]['id'])
+        outlet = self.env['res.partner'].browse(results[1]['id'])
+        self.assertEqual(outlet.name, 'New Outlet')
+        self.assertEqual(outlet.street, 'No. 45 Street')
+        self.assertEqual(outlet.phone, '+234 801')
+
+    def test_unchanged(self):
+        results = self.env['res.partner']._salesman_upsert([
+            {'contact_name': 'Peter Maduka', 'email': 'peter@example.com'},
+        ])
+        self.assertEqual(results[0]['status'], 'unchanged')
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+from ..models.account_move_line import statement_cache
+
+
+class TestCustomerStatement(TransactionCase):
+
+    def setUp(self):
+        super(TestCustomerStatement, self).setUp()
+        self.partner = self.env['res.partner'].create({'name': 'Statement Customer'})
+        self.contact = self.env['res.partner'].create({'name': 'Statement Contact', 'parent_id': self.partner.id})
+        self.product = self.env['product.product'].create({'name': 'Statement Product', 'taxes_id': [(6, 0, [])]})
+        today = fields.Date.context_today(self.env.user)
+        self.overdue = self._create_invoice(100.0, today - timedelta(days=45))
+        self.current = self._create_invoice(40.0, today + timedelta(days=10))
+        statement_cache.clear()
+
+    def _create_invoice(self, price, date_due):
+        invoice = self.env['account.move'].create({
+            'move_type': 'out_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': date_due - timedelta(days=1),
+            'invoice_date_due': date_due,
+            'invoice_line_ids': [(0, 0, {'product_id': self.product.id, 'quantity': 1, 'price_unit': price})],
+        })
+        invoice.action_post()
+        return invoice
+
+    def _statement(self, partner):
+        return self.env['account.move.line']._salesman_get_statements(partner)[partner.id]
+
+    def test_aging_buckets(self):
+        statement = self._statement(self.contact)
+        self.assertEqual(statement['commercial_partner_id'], self.partner.id)
+        self.assertEqual(statement['total_due'], 140.0)
+        self.assertEqual(statement['aging']['0_30'], 40.0)
+        self.assertEqual(statement['aging']['31_60'], 100.0)
+        self.assertEqual([inv['id'] for inv in statement['invoices']], [self.overdue.id, self.current.id])
+
+    def test_payment_invalidates_cache(self):
+        self._statement(self.partner)
+        hits = statement_cache.hits
+        self._statement(self.partner)
+        self.assertEqual(statement_cache.hits, hits + 1)
+
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=self.overdue.ids).create({})._create_payments()
+        statement = self._statement(self.partner)
+        self.assertEqual(statement['total_due'], 40.0)
+        self.assertEqual([inv['id'] for inv in statement['invoices']], [self.current.id])
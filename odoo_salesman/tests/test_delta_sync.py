@@ -0,0 +1,61 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+
+OLD_WRITE_DATE = '2000-01-01 00:00:00'
+UPDATED_SINCE = '2001-01-01 00:00:00'
+
+
+@tagged('-at_install', 'post_install')
+class TestDeltaSync(HttpCase):
+
+    def setUp(self):
+        super(TestDeltaSync, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.product = self.env['product.product'].create({
+            'name': 'Delta Product',
+            'list_price': 10.0,
+        })
+        self.user = self.env['res.users'].create({
+            'name': 'Delta Salesman',
+            'login': 'delta_salesman',
+        })
+        # the records were written before the watermark of the client
+        self.env.flush_all()
+        for table, record_id in [
+            ('product_product', self.product.id),
+            ('product_template', self.product.product_tmpl_id.id),
+            ('res_users', self.user.id),
+            ('res_partner', self.user.partner_id.id),
+        ]:
+            self.env.cr.execute(f"UPDATE {table} SET write_date = %s WHERE id = %s", [OLD_WRITE_DATE, record_id])
+        self.env.invalidate_all()
+
+    def _call(self, url, data):
+        self.env.flush_all()
+        response = self.opener.request(
+            'GET', self.base_url() + url, data=json.dumps(data),
+            headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
+    def test_product_template_changes(self):
+        result = self._call('/api/get-product', {'updated_since': UPDATED_SINCE})
+        self.assertTrue(result['success'])
+        self.assertNotIn(self.product.id, [prd['id'] for prd in result['data']])
+
+        # the price and name are stored on the template
+        self.product.product_tmpl_id.write({'list_price': 42.0})
+        result = self._call('/api/get-product', {'updated_since': UPDATED_SINCE})
+        products = {prd['id']: prd for prd in result['data']}
+        self.assertEqual(products[self.product.id]['sale_price'], 42.0)
+        self.assertIn('watermark', result)
+
+    def test_user_partner_changes(self):
+        result = self._call('/api/get-users', {'updated_since': UPDATED_SINCE})
+        self.assertNotIn(self.user.id, [usr['id'] for usr in result['data']])
+
+        # the user name is stored on its partner
+        self.user.partner_id.name = 'Renamed Salesman'
+        result = self._call('/api/get-users', {'updated_since': UPDATED_SINCE})
+        users = {usr['id']: usr for usr in result['data']}
+        self.assertEqual(users[self.user.id]['user_name'], 'Renamed Salesman')
@@ -0,0 +1,50 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('-at_install', 'post_install')
+class TestExport(HttpCase):
+
+    def setUp(self):
+        super(TestExport, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.products = self.env['product.product'].create([{
+            'name': f'Exported Product {index}',
+            'list_price': 5.0 + index,
+        } for index in range(3)])
+        self.env.flush_all()
+
+    def test_ndjson_batches(self):
+        response = self.url_open('/api/v1/export/products?fields=name,sale_price&batch_size=2', timeout=60)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        ids = [row['id'] for row in rows]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(ids), len(set(ids)))
+        exported = {row['id']: row for row in rows}
+        for index, product in enumerate(self.products):
+            self.assertEqual(exported[product.id], {
+                'id': product.id, 'name': f'Exported Product {index}', 'sale_price': 5.0 + index,
+            })
+
+    def test_contacts_and_orders(self):
+        partner = self.env['res.partner'].create({'name': 'Exported Contact', 'phone': '0800000001'})
+        order = self.env['sale.order'].create({
+            'partner_id': partner.id,
+            'order_line': [(0, 0, {'product_id': self.products[0].id, 'product_uom_qty': 2})],
+        })
+        self.env.flush_all()
+        rows = [json.loads(line) for line in self.url_open('/api/v1/export/contacts').text.splitlines()]
+        self.assertIn({
+            'id': partner.id, 'contact_name': 'Exported Contact', 'address1': None,
+            'address2': None, 'phone': '0800000001', 'email': None,
+        }, rows)
+        rows = [json.loads(line) for line in self.url_open('/api/v1/export/sales_orders').text.splitlines()]
+        exported = next(row for row in rows if row['id'] == order.id)
+        self.assertEqual(exported['order_line'][0]['product_uom_qty'], 2)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.url_open('/api/v1/export/invoices').status_code, 404)
+        self.assertEqual(self.url_open('/api/v1/export/products?fields=not_a_field').status_code, 400)
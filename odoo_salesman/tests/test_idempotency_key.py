@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestIdempotencyKey(TransactionCase):
+
+    def setUp(self):
+        super(TestIdempotencyKey, self).setUp()
+        self.Key = self.env['salesman.idempotency.key']
+        self.calls = []
+
+    def _create_partner(self, response):
+        '''returns a func creating a partner and answering response'''
+        def func():
+            partner = self.env['res.partner'].create({'name': f'Created {len(self.calls)}'})
+            self.calls.append(partner)
+            return dict(response, data=[dict(entry, id=partner.id) if entry.get('success') else entry
+                                        for entry in response['data']])
+        return func
+
+    def test_replay(self):
+        func = self._create_partner({'success': True, 'data': [{'success': True}]})
+        first = self.Key._salesman_run('key-1', 'bulk_create', func)
+        second = self.Key._salesman_run('key-1', 'bulk_create', func)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second, first)
+        # another operation does not share the key
+        self.Key._salesman_run('key-1', 'create', func)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_partial_failure_is_stored(self):
+        func = self._create_partner({'success': False, 'data': [
+            {'index': 0, 'success': True},
+            {'index': 1, 'success': False, 'message': 'Missing required parameters'},
+        ]})
+        first = self.Key._salesman_run('key-2', 'bulk_create', func)
+        self.assertFalse(first['success'])
+        # the retry does not create the order of the first entry again
+        second = self.Key._salesman_run('key-2', 'bulk_create', func)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second, first)
+
+    def test_failure_without_changes_releases_the_key(self):
+        calls = []
+
+        def func():
+            calls.append(1)
+            return {'success': False, 'data': [{'index': 0, 'success': False, 'message': 'No invoice found'}]}
+
+        self.Key._salesman_run('key-3', 'invoice_validation_batch', func)
+        self.Key._salesman_run('key-3', 'invoice_validation_batch', func)
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(self.Key.search([('key', '=', 'key-3')]))
+
+    def test_expired_key(self):
+        func = self._create_partner({'success': True, 'data': [{'success': True}]})
+        self.Key._salesman_run('key-4', 'create', func)
+        key = self.Key.search([('key', '=', 'key-4')])
+        self.assertEqual(key.state, 'done')
+        key.expires_at = fields.Datetime.subtract(fields.Datetime.now(), hours=1)
+        self.Key._salesman_run('key-4', 'create', func)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.Key.search([('key', '=', 'key-4')])), 1)
+
+    def test_concurrent_key_completed(self):
+        func = self._create_partner({'success': True, 'data': [{'success': True}]})
+        first = self.Key._salesman_run('key-5', 'create', func)
+        # the concurrent request stored its response between the lookup and the insert
+        search = type(self.Key).search
+        lookups = []
+
+        def fake_search(model, domain, *args, **kwargs):
+            lookups.append(domain)
+            if len(lookups) == 1:
+                return model.browse()
+            return search(model, domain, *args, **kwargs)
+
+        with patch.object(type(self.Key), 'search', fake_search):
+            second = self.Key._salesman_run('key-5', 'create', func)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(second, first)
+
+        key = self.Key.search([('key', '=', 'key-5')])
+        key.state = 'pending'
+        lookups.clear()
+        with patch.object(type(self.Key), 'search', fake_search):
+            third = self.Key._salesman_run('key-5', 'create', func)
+        self.assertEqual(third, self.Key._salesman_in_progress_response())
@@ -0,0 +1,103 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('-at_install', 'post_install')
+class TestInvoiceValidation(HttpCase):
+
+    def setUp(self):
+        super(TestInvoiceValidation, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.partner = self.env['res.partner'].create({'name': 'Test Partner'})
+        self.product = self.env['product.product'].create({
+            'name': 'Test Product',
+            'list_price': 100.0,
+            'invoice_policy': 'order',
+            'taxes_id': [(5, 0, 0)],
+        })
+        self.journal = self.env['account.journal'].search(
+            [('company_id', '=', self.env.company.id), ('type', '=', 'bank')], limit=1)
+        orders = self.env['sale.order'].create([{
+            'partner_id': self.partner.id,
+            'order_line': [(0, 0, {'product_id': self.product.id, 'product_uom_qty': qty})],
+        } for qty in (1, 2)])
+        orders.action_confirm()
+        self.invoices = orders._create_invoices(grouped=True)
+
+    def _validate(self, data):
+        self.env.flush_all()
+        response = self.url_open(
+            '/api/v1/invoice-validation', data=json.dumps(data),
+            headers={'Content-Type': 'application/json'}, timeout=60)
+        self.env.invalidate_all()
+        return response.json()['result']
+
+    def test_batch_payment(self):
+        bill = self.env['account.move'].create({
+            'move_type': 'in_invoice',
+            'partner_id': self.partner.id,
+            'invoice_date': '2024-05-01',
+            'invoice_line_ids': [(0, 0, {'name': 'Bill line', 'quantity': 1, 'price_unit': 50.0})],
+        })
+        result = self._validate({
+            'invoice_ids': self.invoices.ids + [bill.id],
+            'is_register_payment': True,
+            'journal_id': self.journal.id,
+        })
+        self.assertFalse(result['success'])
+        lines = {line['invoice_id']: line for line in result['data']}
+        self.assertEqual(set(self.invoices.mapped('state')), {'posted'})
+        self.assertTrue(all(state in ('paid', 'in_payment') for state in self.invoices.mapped('payment_state')))
+        payments = self.env['account.payment'].browse([lines[inv.id]['payment_id'] for inv in self.invoices])
+        self.assertEqual(payments.mapped('journal_id'), self.journal)
+        self.assertEqual(payments.mapped('amount'), self.invoices.mapped('amount_total'))
+        self.assertFalse(lines[bill.id]['success'])
+        self.assertFalse(lines[bill.id]['payment_id'])
+
+        # running the validation again does not pay the invoices twice
+        result = self._validate({
+            'invoice_ids': self.invoices.ids,
+            'is_register_payment': True,
+            'journal_id': self.journal.id,
+        })
+        self.assertTrue(result['success'])
+        self.assertEqual([line['payment_id'] for line in result['data']], [None, None])
+        self.assertEqual(self.env['account.payment'].search_count([('partner_id', '=', self.partner.id)]), 2)
+
+    def test_single_payment_journal(self):
+        journal = self.env['account.journal'].search(
+            [('company_id', '=', self.env.company.id), ('type', '=', 'cash')], limit=1)
+        invoice = self.invoices[0]
+        invoice.action_post()
+        result = self._validate({
+            'invoice_id': invoice.id,
+            'invoice_number': invoice.name,
+            'is_register_payment': True,
+            'journal_id': journal.id,
+        })
+        self.assertTrue(result['success'])
+        payment = self.env['account.payment'].search([('ref', '=', invoice.name)])
+        self.assertEqual(payment.journal_id, journal)
+        self.assertEqual(payment.payment_method_line_id.journal_id, journal)
+
+    def test_partially_paid_invoice(self):
+        invoice = self.invoices[0]
+        invoice.action_post()
+        self.env['account.payment.register'].with_context(
+            active_model='account.move', active_ids=invoice.ids,
+        ).create({'amount': 40.0, 'journal_id': self.journal.id})._create_payments()
+        self.assertEqual(invoice.payment_state, 'partial')
+        result = self._validate({
+            'invoice_ids': self.invoices.ids,
+            'is_register_payment': True,
+            'journal_id': self.journal.id,
+        })
+        self.assertTrue(result['success'])
+        lines = {line['invoice_id']: line for line in result['data']}
+        payment = self.env['account.payment'].browse(lines[invoice.id]['payment_id'])
+        # only the residual of the partially paid invoice is paid
+        self.assertEqual(payment.amount, 60.0)
+        self.assertEqual(self.env['account.payment'].browse(lines[self.invoices[1].id]['payment_id']).amount, 200.0)
+        self.assertTrue(invoice.currency_id.is_zero(invoice.amount_residual))
+        self.assertIn(invoice.payment_state, ('paid', 'in_payment'))
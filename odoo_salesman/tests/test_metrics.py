@@ -0,0 +1,39 @@
+from odoo.tests import HttpCase, tagged
+
+from ..tools import metrics
+
+
+@tagged('-at_install', 'post_install')
+class TestMetrics(HttpCase):
+
+    def test_render_prometheus(self):
+        # the metrics are kept per worker, the route name is unique to the run
+        route = f'test_route_{id(self)}'
+        for duration in (0.1, 0.2, 0.3, 0.4):
+            metrics._record(route, 'op', [], 0, duration=duration, query_count=4, query_time=0.01,
+                            payload_size=10, rows=2)
+        body = metrics.render_prometheus(extra_counters=[('test_cache_hits_total', 'Cache hits', 7)])
+        labels = f'route="{route}",operation="op"'
+        self.assertIn('# TYPE salesman_request_duration_seconds summary', body)
+        self.assertIn(f'salesman_request_duration_seconds{{{labels},quantile="0.5"}} 0.3', body)
+        self.assertIn(f'salesman_request_duration_seconds{{{labels},quantile="0.99"}} 0.4', body)
+        self.assertIn(f'salesman_request_sql_queries{{{labels},quantile="0.95"}} 4', body)
+        self.assertIn(f'salesman_request_result_rows_sum{{{labels}}} 8.0', body)
+        self.assertIn('# TYPE test_cache_hits_total counter\ntest_cache_hits_total 7', body)
+        self.assertEqual(metrics.last_sample(route, 'op')['duration'], 0.4)
+
+    def test_administrators_only(self):
+        self.env['res.users'].create({
+            'name': 'Metrics Salesman',
+            'login': 'metrics_salesman',
+            'password': 'metrics_salesman',
+            'groups_id': [(6, 0, [self.env.ref('sales_team.group_sale_salesman').id])],
+        })
+        self.authenticate('metrics_salesman', 'metrics_salesman')
+        self.assertEqual(self.url_open('/api/v1/metrics').status_code, 403)
+
+        self.authenticate('admin', 'admin')
+        response = self.url_open('/api/v1/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('salesman_availability_cache_hits_total', response.text)
@@ -0,0 +1,50 @@
+from odoo.tests.common import TransactionCase
+
+from ..models.res_partner import partner_geo_indexes
+from ..tools import GridIndex
+
+
+class TestNearbyContacts(TransactionCase):
+
+    def setUp(self):
+        super(TestNearbyContacts, self).setUp()
+        if 'partner_latitude' not in self.env['res.partner']._fields:
+            self.skipTest("base_geolocalize is not installed")
+        partner_geo_indexes.clear()
+        self.Partner = self.env['res.partner']
+        # around Lagos, Ikeja is ~17 km north of Lagos Island, Ibadan ~110 km
+        self.island = self.Partner.create({'name': 'Lagos Island Outlet', 'partner_latitude': 6.4541, 'partner_longitude': 3.3947})
+        self.ikeja = self.Partner.create({'name': 'Ikeja Outlet', 'partner_latitude': 6.6018, 'partner_longitude': 3.3515})
+        self.ibadan = self.Partner.create({'name': 'Ibadan Outlet', 'partner_latitude': 7.3775, 'partner_longitude': 3.9470})
+
+    def _nearby(self, **kwargs):
+        return [(round(distance), partner) for distance, partner in self.Partner._salesman_nearby(6.45, 3.39, **kwargs)
+                if partner in self.island | self.ikeja | self.ibadan]
+
+    def test_nearest_first(self):
+        nearby = self._nearby(limit=50)
+        self.assertEqual([partner for _distance, partner in nearby], [self.island, self.ikeja, self.ibadan])
+        self.assertEqual(nearby[0][0], 1)
+
+    def test_radius(self):
+        self.assertEqual([partner for _distance, partner in self._nearby(limit=50, radius_km=30)],
+                         [self.island, self.ikeja])
+
+    def test_incremental_refresh(self):
+        self._nearby(limit=50)
+        partner_geo_indexes[self.env.cr.dbname].refreshed_at = None
+        self.ikeja.write({'partner_latitude': 9.0765, 'partner_longitude': 7.3986})
+        self.island.unlink()
+        self.assertEqual([partner for _distance, partner in self._nearby(limit=50, radius_km=200)], [self.ibadan])
+
+
+class TestGridIndex(TransactionCase):
+
+    def test_grid_index(self):
+        index = GridIndex(cell_size=1)
+        index.upsert(1, 0.5, 0.5)
+        index.upsert(2, 0.5, 2.5)
+        index.upsert(3, 0.5, 9.5)
+        self.assertEqual([key for _distance, key in index.nearest(0.5, 0.4, 2)], [1, 2])
+        index.remove(1)
+        self.assertEqual([key for _distance, key in index.nearest(0.5, 0.4, 2)], [2, 3])
@@ -0,0 +1,50 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestSalesOrderJob(TransactionCase):
+
+    def setUp(self):
+        super(TestSalesOrderJob, self).setUp()
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Partner',
+            'email': 'test@example.com'
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Test Product',
+            'list_price': 100.0,
+            'invoice_policy': 'order',
+        })
+        self.salesman = self.env['res.users'].create({
+            'name': 'Queued Salesman',
+            'login': 'queued_salesman',
+            'groups_id': [(6, 0, [self.env.ref('sales_team.group_sale_salesman').id])],
+        })
+        self.Job = self.env['salesman.order.job']
+
+    def test_process_queued_orders(self):
+        jobs = self.Job.with_user(self.salesman)._salesman_enqueue([
+            {
+                'partner_id': self.partner.id,
+                'company_id': self.env.company.id,
+                'order_lines': [{'product_id': self.product.id, 'product_uom_qty': 2}],
+            },
+            {
+                'partner_id': self.partner.id,
+                'company_id': self.env.company.id,
+                'order_lines': [{'product_id': 0, 'product_uom_qty': 1}],
+            },
+        ])
+        self.assertEqual(jobs.mapped('state'), ['pending', 'pending'])
+
+        self.Job._salesman_process_jobs()
+        done, failed = jobs
+        self.assertEqual(done.state, 'done')
+        self.assertEqual(done.sale_order_id.state, 'sale')
+        self.assertEqual(done.sale_order_id.order_line.product_uom_qty, 2)
+        self.assertTrue(done.invoice_id)
+        # the cron creates the orders as the salesman who queued them
+        self.assertEqual(done.sale_order_id.user_id, self.salesman)
+        self.assertEqual(done.sale_order_id.company_id, self.env.company)
+        self.assertEqual(failed.state, 'failed')
+        self.assertTrue(failed.error)
+        self.assertFalse(failed.sale_order_id)
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+from ..tools.payload import Payload, dumps, loads
+
+
+class TestPayload(TransactionCase):
+
+    def test_typed_getters(self):
+        data = Payload({'product_id': 3, 'job_ids': [1, 2], 'lines': [{'product_id': 1}], 'q': 'mad'}, self.env)
+        self.assertEqual(data.get_int('product_id'), 3)
+        self.assertIsNone(data.get_int('contact_id'))
+        self.assertEqual(data.get_int_list('job_ids'), [1, 2])
+        self.assertEqual(data.get_list('lines'), [{'product_id': 1}])
+        self.assertEqual(data.get_str('q'), 'mad')
+        self.assertIsNone(data.get_str('contact_name'))
+        self.assertTrue(Payload({'strict': 1}, self.env).get_bool('strict'))
+        self.assertFalse(data.get_bool('strict'))
+
+    def test_invalid_values(self):
+        data = Payload({'product_id': '3', 'job_ids': [1, '2'], 'lines': [1], 'q': 3}, self.env)
+        with self.assertRaises(ValidationError):
+            data.get_int('product_id')
+        with self.assertRaises(ValidationError):
+            data.get_int_list('job_ids')
+        with self.assertRaises(ValidationError):
+            data.get_list('lines')
+        with self.assertRaises(ValidationError):
+            data.get_int('order_id', required=True)
+        with self.assertRaises(ValidationError):
+            data.get_str('q')
+
+    def test_codec(self):
+        value = {'b': 1, 'a': [1.5, None, 'x']}
+        self.assertEqual(loads(dumps(value)), value)
+        self.assertEqual(list(loads(dumps(value, sort_keys=True))), ['a', 'b'])
+        # datetimes are sent like the json module with default=str does
+        self.assertEqual(loads(dumps({'date': datetime(2024, 5, 1, 8, 0)})), {'date': '2024-05-01 08:00:00'})
@@ -0,0 +1,90 @@
+from odoo.tests.common import TransactionCase
+
+from ..models.product_pricelist import pricing_cache
+
+
+class TestPricing(TransactionCase):
+
+    def setUp(self):
+        super(TestPricing, self).setUp()
+        self.product_1 = self.env['product.product'].create({
+            'name': 'Priced Product 1',
+            'list_price': 100.0,
+            'taxes_id': [(6, 0, [])],
+        })
+        self.product_2 = self.env['product.product'].create({
+            'name': 'Priced Product 2',
+            'list_price': 50.0,
+            'taxes_id': [(6, 0, [])],
+        })
+        self.pricelist = self.env['product.pricelist'].create({
+            'name': 'Salesman Pricelist',
+            'discount_policy': 'with_discount',
+            'item_ids': [(0, 0, {
+                'applied_on': '0_product_variant',
+                'product_id': self.product_1.id,
+                'min_quantity': 10,
+                'compute_price': 'percentage',
+                'percent_price': 10,
+            })],
+        })
+        pricing_cache.clear()
+
+    def _prices(self, lines):
+        return {(line['product_id'], line['product_uom_qty']): line
+                for line in self.pricelist._salesman_get_prices(lines)}
+
+    def test_qty_brackets(self):
+        prices = self._prices([
+            {'product_id': self.product_1.id, 'product_uom_qty': 1},
+            {'product_id': self.product_1.id, 'product_uom_qty': 10},
+            {'product_id': self.product_2.id, 'product_uom_qty': 10},
+        ])
+        self.assertEqual(prices[(self.product_1.id, 1)]['price_unit'], 100.0)
+        self.assertEqual(prices[(self.product_1.id, 10)]['price_unit'], 90.0)
+        self.assertEqual(prices[(self.product_1.id, 10)]['price_subtotal'], 900.0)
+        self.assertEqual(prices[(self.product_2.id, 10)]['price_unit'], 50.0)
+
+    def test_discount_shown(self):
+        self.pricelist.discount_policy = 'without_discount'
+        line = self._prices([{'product_id': self.product_1.id, 'product_uom_qty': 10}])[(self.product_1.id, 10)]
+        self.assertEqual(line['price_unit'], 100.0)
+        self.assertAlmostEqual(line['discount'], 10.0)
+        self.assertAlmostEqual(line['price_subtotal'], 900.0)
+
+    def test_cache_invalidation(self):
+        lines = [{'product_id': self.product_1.id, 'product_uom_qty': 12}]
+        self._prices(lines)
+        hits = pricing_cache.hits
+        self._prices(lines)
+        self.assertGreater(pricing_cache.hits, hits)
+
+        self.pricelist.item_ids.percent_price = 20
+        self.assertEqual(self._prices(lines)[(self.product_1.id, 12)]['price_unit'], 80.0)
+
+        self.product_1.list_price = 200.0
+        self.assertEqual(self._prices(lines)[(self.product_1.id, 12)]['price_unit'], 160.0)
+
+    def test_qty_brackets_invalidation(self):
+        lines = [{'product_id': self.product_1.id, 'product_uom_qty': 6}]
+        self.assertEqual(self._prices(lines)[(self.product_1.id, 6)]['price_unit'], 100.0)
+        self.assertIn(10.0, self.pricelist._salesman_qty_brackets())
+
+        # the quantity 6 now falls in the bracket of the rule
+        self.pricelist.item_ids.min_quantity = 5
+        self.assertIn(5.0, self.pricelist._salesman_qty_brackets())
+        self.assertEqual(self._prices(lines)[(self.product_1.id, 6)]['price_unit'], 90.0)
+
+        # without cache the brackets are read again
+        self.env['product.pricelist.item'].create({
+            'pricelist_id': self.pricelist.id,
+            'applied_on': '0_product_variant',
+            'product_id': self.product_2.id,
+            'min_quantity': 3,
+            'compute_price': 'percentage',
+            'percent_price': 50,
+        })
+        prices = self.pricelist._salesman_get_prices(
+            [{'product_id': self.product_2.id, 'product_uom_qty': 4}], use_cache=False)
+        self.assertEqual(prices[0]['price_unit'], 25.0)
+        self.assertIn(3.0, self.pricelist._salesman_qty_brackets(0))
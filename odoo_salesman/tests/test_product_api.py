@@ -0,0 +1,77 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+
+
+@tagged('-at_install', 'post_install')
+class TestProductController(HttpCase):
+
+    def setUp(self):
+        super(TestProductController, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.Product = self.env['product.product']
+        self.first_id = max(self.Product.with_context(active_test=False).search([]).ids or [0])
+        self.products = self.Product.create([{
+            'name': f'Paged Product {index}',
+            'list_price': 10.0 * (index + 1),
+        } for index in range(4)])
+
+    def _get_products(self, data):
+        self.env.flush_all()
+        response = self.opener.request(
+            'GET', self.base_url() + '/api/get-product', data=json.dumps(data),
+            headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
+    def test_cursor_pages(self):
+        result = self._get_products({'limit': 2, 'after_id': self.first_id})
+        self.assertTrue(result['success'])
+        self.assertEqual([prd['id'] for prd in result['data']], self.products[:2].ids)
+        self.assertEqual(result['next_cursor'], self.products[1].id)
+
+        result = self._get_products({'limit': 2, 'after_id': result['next_cursor']})
+        self.assertEqual([prd['id'] for prd in result['data']], self.products[2:].ids)
+        self.assertEqual(result['next_cursor'], self.products[3].id)
+
+        # the catalog ends on a full page, the next one is empty
+        result = self._get_products({'limit': 2, 'after_id': result['next_cursor']})
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], [])
+        self.assertIsNone(result['next_cursor'])
+
+    def test_selected_fields(self):
+        result = self._get_products({
+            'limit': 1, 'after_id': self.first_id, 'fields': ['sale_price', 'default_code'],
+        })
+        self.assertEqual(result['data'], [{'id': self.products[0].id, 'sale_price': 10.0, 'default_code': False}])
+
+        result = self._get_products({'fields': ['sale_price', 'not_a_field']})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 400)
+        self.assertIn('not_a_field', result['message'])
+
+        result = self._get_products({'limit': -1})
+        self.assertEqual(result['status_code'], 400)
+
+    def test_etag(self):
+        product = self.products[0]
+        # the product and its template were written before the first request
+        self.env.flush_all()
+        for table, record_id in [('product_product', product.id), ('product_template', product.product_tmpl_id.id)]:
+            self.env.cr.execute(
+                f"UPDATE {table} SET write_date = '2000-01-01 00:00:00' WHERE id = %s", [record_id])
+        self.env.invalidate_all()
+        result = self._get_products({'product_id': product.id})
+        etag = result['etag']
+        self.assertTrue(etag)
+
+        result = self._get_products({'product_id': product.id, 'if_none_match': etag})
+        self.assertEqual(result['status_code'], 304)
+        self.assertNotIn('data', result)
+
+        # the price is stored on the template
+        product.product_tmpl_id.list_price = 99.0
+        result = self._get_products({'product_id': product.id, 'if_none_match': etag})
+        self.assertNotIn('status_code', result)
+        self.assertNotEqual(result['etag'], etag)
+        self.assertEqual(result['data'][0]['sale_price'], 99.0)
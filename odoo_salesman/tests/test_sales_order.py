@@ -1,3 +1,5 @@
+import json
+
 from odoo.tests import HttpCase, tagged
 
 @tagged('-at_install', 'post_install')
@@ -5,6 +7,7 @@ class TestSalesOrderController(HttpCase):
 
     def setUp(self):
         super(TestSalesOrderController, self).setUp()
+        self.authenticate('admin', 'admin')
         self.partner = self.env['res.partner'].create({
             'name': 'Test Partner',
             'email': 'test@example.com'
@@ -18,21 +21,28 @@ class TestSalesOrderController(HttpCase):
             'list_price': 200.0
         })
 
+    def _post_operation(self, data):
+        self.env.flush_all()
+        response = self.url_open(
+            '/api/sales_order/operation', data=json.dumps(data),
+            headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
     def test_01_create_sales_order(self):
         order_lines = [
             {"product_id": self.product_1.id, "product_uom_qty": 1, "price_unit": 100.0},
             {"product_id": self.product_2.id, "product_uom_qty": 2, "price_unit": 200.0}
         ]
         data = {
+            'operation': 'create',
             'partner_id': self.partner.id,
             'order_lines': order_lines
         }
         
-        response = self.url_open('/api/sales_order/create', json=data)
-        result = response.json()
+        result = self._post_operation(data)
 
         self.assertTrue(result.get('success'))
-        order_id = result.get('order_id')
+        order_id = result['data'].get('so_id')
         self.assertTrue(order_id)
 
         order = self.env['sale.order'].browse(order_id)
@@ -63,8 +73,7 @@ class TestSalesOrderController(HttpCase):
             ]
         })
 
-        response = self.url_open(f'/api/sales_order/{order.id}')
-        result = response.json()
+        result = self._post_operation({'operation': 'get', 'id': order.id})['result']
 
         self.assertEqual(result['id'], order.id)
         self.assertEqual(result['partner_id'], self.partner.id)
@@ -75,3 +84,55 @@ class TestSalesOrderController(HttpCase):
         self.assertEqual(result['order_line'][1]['product_uom_qty'], 2)
         self.assertEqual(result['order_line'][0]['price_unit'], 100.0)
         self.assertEqual(result['order_line'][1]['price_unit'], 200.0)
+
+    def test_03_quote_sales_order(self):
+        order_count = self.env['sale.order'].search_count([])
+        data = {
+            'operation': 'quote',
+            'partner_id': self.partner.id,
+            'order_lines': [
+                {"product_id": self.product_1.id, "product_uom_qty": 1},
+                {"product_id": self.product_2.id, "product_uom_qty": 2},
+                {"product_id": 0, "product_uom_qty": 1},
+            ]
+        }
+
+        result = self._post_operation(data)
+
+        self.assertFalse(result['success'])
+        self.assertEqual([error['code'] for error in result['errors']], ['product_not_found'])
+        lines = result['data']['order_lines']
+        self.assertEqual(lines[0]['price_unit'], 100.0)
+        self.assertEqual(lines[1]['price_unit'], 200.0)
+        self.assertTrue(lines[1]['is_available'])
+        self.assertEqual(result['data']['amount_untaxed'], 500.0)
+        self.assertEqual(self.env['sale.order'].search_count([]), order_count)
+
+    def test_04_list_sales_orders(self):
+        orders = self.env['sale.order'].create([{
+            'partner_id': self.partner.id,
+            'order_line': [(0, 0, {'product_id': self.product_1.id, 'product_uom_qty': qty})],
+        } for qty in (1, 2, 3)])
+        orders[2].action_confirm()
+
+        result = self._post_operation({'operation': 'list', 'partner_ids': [self.partner.id], 'limit': 2})
+        self.assertTrue(result['success'])
+        self.assertEqual([order['id'] for order in result['data']], orders[:2].ids)
+        self.assertEqual(result['data'][1]['order_line'][0]['product_uom_qty'], 2)
+        self.assertEqual(result['next_cursor'], orders[1].id)
+
+        result = self._post_operation({
+            'operation': 'list', 'partner_ids': [self.partner.id], 'limit': 2, 'after_id': result['next_cursor'],
+        })
+        self.assertEqual([order['id'] for order in result['data']], orders[2:].ids)
+        self.assertIsNone(result['next_cursor'])
+
+        result = self._post_operation({'operation': 'list', 'partner_ids': [self.partner.id], 'state': 'sale'})
+        self.assertEqual([order['id'] for order in result['data']], orders[2:].ids)
+
+        result = self._post_operation({'operation': 'list', 'names': [orders[0].name], 'state': ['draft', 'sale']})
+        self.assertEqual([order['id'] for order in result['data']], orders[:1].ids)
+
+        result = self._post_operation({'operation': 'list', 'partner_ids': ['x']})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['status_code'], 400)
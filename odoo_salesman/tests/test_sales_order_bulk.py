@@ -0,0 +1,55 @@
+from odoo.tests.common import TransactionCase
+
+
+class TestSalesOrderBulkCreate(TransactionCase):
+
+    def setUp(self):
+        super(TestSalesOrderBulkCreate, self).setUp()
+        self.partner = self.env['res.partner'].create({
+            'name': 'Test Partner',
+            'email': 'test@example.com'
+        })
+        self.product = self.env['product.product'].create({
+            'name': 'Test Product',
+            'list_price': 100.0,
+            'invoice_policy': 'order',
+        })
+        self.SaleOrder = self.env['sale.order']
+
+    def test_bulk_create(self):
+        results = self.SaleOrder._salesman_bulk_create([
+            {
+                'partner_id': self.partner.id,
+                'order_lines': [{'product_id': self.product.id, 'product_uom_qty': 1}],
+            },
+            {'partner_id': self.partner.id},
+            {
+                'partner_id': self.partner.id,
+                'company_id': self.env.company.id,
+                'order_lines': [{'product_id': self.product.id, 'product_uom_qty': 3}],
+            },
+        ])
+        self.assertEqual([result['success'] for result in results], [True, False, True])
+        self.assertEqual([result['index'] for result in results], [0, 1, 2])
+        orders = self.SaleOrder.browse([results[0]['so_id'], results[2]['so_id']])
+        self.assertEqual(orders.mapped('state'), ['sale', 'sale'])
+        # an order without company_id gets the default company of the user
+        self.assertEqual(orders.mapped('company_id'), self.env.company)
+        self.assertEqual(orders[1].order_line.product_uom_qty, 3)
+        self.assertEqual(results[2]['invoice_id'], orders[1].invoice_ids.id)
+
+    def test_bad_order_does_not_block_the_batch(self):
+        results = self.SaleOrder._salesman_bulk_create([
+            {
+                'partner_id': self.partner.id,
+                'order_lines': [{'product_id': 0, 'product_uom_qty': 1}],
+            },
+            {
+                'partner_id': self.partner.id,
+                'order_lines': [{'product_id': self.product.id, 'product_uom_qty': 2}],
+            },
+        ])
+        self.assertFalse(results[0]['success'])
+        self.assertTrue(results[0]['message'])
+        self.assertTrue(results[1]['success'])
+        self.assertEqual(self.SaleOrder.browse(results[1]['so_id']).order_line.product_uom_qty, 2)
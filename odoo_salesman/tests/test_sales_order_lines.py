@@ -0,0 +1,43 @@
+from odoo.exceptions import ValidationError
+from odoo.tests.common import TransactionCase
+
+
+class TestSalesOrderLineCommands(TransactionCase):
+
+    def setUp(self):
+        super(TestSalesOrderLineCommands, self).setUp()
+        self.partner = self.env['res.partner'].create({'name': 'Test Partner'})
+        self.product_1 = self.env['product.product'].create({'name': 'Test Product 1', 'list_price': 100.0})
+        self.product_2 = self.env['product.product'].create({'name': 'Test Product 2', 'list_price': 200.0})
+        self.order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'order_line': [
+                (0, 0, {'product_id': self.product_1.id, 'product_uom_qty': 1}),
+                (0, 0, {'product_id': self.product_1.id, 'product_uom_qty': 2}),
+                (0, 0, {'product_id': self.product_2.id, 'product_uom_qty': 3}),
+            ]
+        })
+        self.line_1, self.line_2, self.line_3 = self.order.order_line
+
+    def test_match_by_product_and_id(self):
+        commands = self.order._salesman_order_line_commands([
+            {'product_id': self.product_1.id, 'product_uom_qty': 5},
+            {'id': self.line_1.id, 'product_uom_qty': 4},
+            {'product_id': self.product_1.id, 'product_uom_qty': 6},
+        ])
+        self.assertEqual(commands, [
+            (1, self.line_2.id, {'product_id': self.product_1.id, 'product_uom_qty': 5}),
+            (1, self.line_1.id, {'product_uom_qty': 4}),
+            (0, 0, {'product_id': self.product_1.id, 'product_uom_qty': 6}),
+        ])
+
+    def test_replace_removes_missing_lines(self):
+        self.order.write({'order_line': self.order._salesman_order_line_commands(
+            [{'product_id': self.product_2.id, 'product_uom_qty': 7}], replace=True)})
+        self.assertEqual(self.order.order_line, self.line_3)
+        self.assertEqual(self.line_3.product_uom_qty, 7)
+
+    def test_foreign_line_id(self):
+        other = self.order.copy()
+        with self.assertRaises(ValidationError):
+            self.order._salesman_order_line_commands([{'id': other.order_line[0].id}])
@@ -1,12 +1,13 @@
-from odoo.tests.common import TransactionCase
-from odoo import http
-from odoo.http import request
 import json
 
-class TestSalesOrderController(TransactionCase):
+from odoo.tests import HttpCase, tagged
+
+@tagged('-at_install', 'post_install')
+class TestSalesOrderControllerSide(HttpCase):
 
     def setUp(self):
-        super(TestSalesOrderController, self).setUp()
+        super(TestSalesOrderControllerSide, self).setUp()
+        self.authenticate('admin', 'admin')
         self.partner = self.env['res.partner'].create({
             'name': 'Test Partner',
             'email': 'test@example.com'
@@ -20,31 +21,39 @@ class TestSalesOrderController(TransactionCase):
             'list_price': 200.0
         })
 
+    def _post_operation(self, data):
+        self.env.flush_all()
+        response = self.url_open(
+            '/api/sales_order/operation', data=json.dumps(data),
+            headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
     def test_create_sales_order(self):
         order_lines = [
             {"product_id": self.product_1.id, "product_uom_qty": 1, "price_unit": 100.0},
             {"product_id": self.product_2.id, "product_uom_qty": 2, "price_unit": 200.0}
         ]
         data = {
+            'operation': 'create',
             'partner_id': self.partner.id,
+            'company_id': self.env.company.id,
             'order_lines': order_lines
         }
-        response = self.env['ir.http'].session_csrf('/api/sales_order/create', type='json', data=data)
-        result = json.loads(response.data.decode('utf-8'))
+        result = self._post_operation(data)
 
         self.assertTrue(result.get('success'))
-        order_id = result.get('order_id')
+        order_id = result['data'].get('so_id')
         self.assertTrue(order_id)
 
         order = self.env['sale.order'].browse(order_id)
+        self.assertEqual(order.state, 'sale')
+        self.assertEqual(order.company_id, self.env.company)
+        self.assertEqual(result['data']['so_number'], order.name)
+        self.assertEqual(result['data']['invoice_id'], order.invoice_ids.id)
         self.assertEqual(order.partner_id.id, self.partner.id)
         self.assertEqual(len(order.order_line), 2)
-        self.assertEqual(order.order_line[0].product_id.id, self.product_1.id)
-        self.assertEqual(order.order_line[1].product_id.id, self.product_2.id)
         self.assertEqual(order.order_line[0].product_uom_qty, 1)
         self.assertEqual(order.order_line[1].product_uom_qty, 2)
-        self.assertEqual(order.order_line[0].price_unit, 100.0)
-        self.assertEqual(order.order_line[1].price_unit, 200.0)
 
     def test_get_sales_order(self):
         order = self.env['sale.order'].create({
@@ -63,15 +72,16 @@ class TestSalesOrderController(TransactionCase):
             ]
         })
 
-        response = self.env['ir.http'].session_csrf(f'/api/sales_order/{order.id}', type='http')
-        result = json.loads(response.data.decode('utf-8'))
+        result = self._post_operation({'operation': 'get', 'so_number': order.name})['result']
 
         self.assertEqual(result['id'], order.id)
+        self.assertEqual(result['name'], order.name)
         self.assertEqual(result['partner_id'], self.partner.id)
         self.assertEqual(len(result['order_line']), 2)
         self.assertEqual(result['order_line'][0]['product_id'], self.product_1.id)
         self.assertEqual(result['order_line'][1]['product_id'], self.product_2.id)
-        self.assertEqual(result['order_line'][0]['product_uom_qty'], 1)
-        self.assertEqual(result['order_line'][1]['product_uom_qty'], 2)
         self.assertEqual(result['order_line'][0]['price_unit'], 100.0)
         self.assertEqual(result['order_line'][1]['price_unit'], 200.0)
+
+        result = self._post_operation({'operation': 'get', 'so_number': 'not an order'})
+        self.assertFalse(result['success'])
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+from ..models.sales_rollup import WATERMARK_PARAM
+
+
+class TestSalesRollup(TransactionCase):
+
+    def setUp(self):
+        super(TestSalesRollup, self).setUp()
+        self.Rollup = self.env['salesman.sales.rollup']
+        self.partner = self.env['res.partner'].create({'name': 'Rollup Customer'})
+        self.product_1 = self.env['product.product'].create({'name': 'Rollup Product 1', 'list_price': 10.0})
+        self.product_2 = self.env['product.product'].create({'name': 'Rollup Product 2', 'list_price': 5.0})
+        self.yesterday = fields.Datetime.now() - timedelta(days=1)
+        self.order = self._create_order([(self.product_1, 2), (self.product_2, 1)])
+        self._create_order([(self.product_1, 1)])
+
+    def _create_order(self, lines):
+        order = self.env['sale.order'].create({
+            'partner_id': self.partner.id,
+            'order_line': [(0, 0, {
+                'product_id': product.id, 'product_uom_qty': qty, 'price_unit': product.list_price,
+            }) for product, qty in lines],
+        })
+        order.action_confirm()
+        order.date_order = self.yesterday
+        return order
+
+    def _summary(self, group_by):
+        day = self.yesterday.date()
+        return self.Rollup._salesman_summary(day, day, group_by, user_ids=[self.env.uid])
+
+    def test_refresh_and_summary(self):
+        self.Rollup._salesman_refresh()
+        [totals] = self._summary(['user'])
+        self.assertEqual(totals['order_count'], 2)
+        self.assertEqual(totals['amount_untaxed'], 35.0)
+
+        per_product = {row['product_id']: row for row in self._summary(['product'])}
+        self.assertEqual(per_product[self.product_1.id]['order_count'], 2)
+        self.assertEqual(per_product[self.product_1.id]['qty'], 3.0)
+        self.assertEqual(per_product[self.product_2.id]['amount_untaxed'], 5.0)
+
+    def test_incremental_refresh(self):
+        self.Rollup._salesman_refresh()
+        self.assertTrue(self.env['ir.config_parameter'].get_param(WATERMARK_PARAM))
+        self.order._action_cancel()
+        # the cancellation is written after the watermark minus the overlap
+        self.Rollup._salesman_refresh()
+        [totals] = self._summary(['user'])
+        self.assertEqual(totals['order_count'], 1)
+        self.assertEqual(totals['amount_untaxed'], 10.0)
+
+    def test_product_filter(self):
+        self.Rollup._salesman_refresh()
+        day = self.yesterday.date()
+        [totals] = self.Rollup._salesman_summary(
+            day, day, ['user'], user_ids=[self.env.uid], product_ids=[self.product_2.id])
+        self.assertEqual(totals['order_count'], 1)
+        self.assertEqual(totals['qty'], 1.0)
+        self.assertEqual(totals['amount_untaxed'], 5.0)
+
+        # the orders are counted once per product of the filter
+        [totals] = self.Rollup._salesman_summary(
+            day, day, ['user'], user_ids=[self.env.uid], product_ids=[self.product_1.id, self.product_2.id])
+        self.assertEqual(totals['order_count'], 3)
+        self.assertEqual(totals['amount_untaxed'], 35.0)
+
+    def test_moved_order_date(self):
+        self.Rollup._salesman_refresh()
+        earlier = self.yesterday - timedelta(days=2)
+        self.order.date_order = earlier
+        self.Rollup._salesman_refresh()
+        # the day the order left no longer counts it
+        [totals] = self._summary(['user'])
+        self.assertEqual(totals['order_count'], 1)
+        self.assertEqual(totals['amount_untaxed'], 10.0)
+        [totals] = self.Rollup._salesman_summary(
+            earlier.date(), earlier.date(), ['user'], user_ids=[self.env.uid])
+        self.assertEqual(totals['order_count'], 1)
+        self.assertEqual(totals['amount_untaxed'], 25.0)
+        self.assertFalse(self.env['salesman.sales.rollup.day'].search([]))
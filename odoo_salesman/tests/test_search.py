@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from ..tools import search
+
+
+class TestRankedSearch(TransactionCase):
+
+    def setUp(self):
+        super(TestRankedSearch, self).setUp()
+        Partner = self.env['res.partner']
+        self.contains = Partner.create({'name': 'Outlet Qwzmadu'})
+        self.prefix = Partner.create({'name': 'Qwzmadu Stores'})
+        self.email = Partner.create({'name': 'Corner Shop', 'email': 'qwzmadu@example.com'})
+        self.other = Partner.create({'name': 'Unrelated Outlet'})
+
+    def test_prefix_matches_first(self):
+        partners = self.env['res.partner']._salesman_search('qwzmadu', limit=10)
+        self.assertEqual(set(partners.ids), {self.contains.id, self.prefix.id, self.email.id})
+        self.assertIn(partners[0], self.prefix | self.email)
+        self.assertEqual(partners[2], self.contains)
+
+    def test_ilike_fallback(self):
+        with patch.dict(search._trgm_installed, {self.env.cr.dbname: False}):
+            partners = self.env['res.partner']._salesman_search('QWZMADU', limit=10)
+            self.assertEqual(partners[2], self.contains)
+            self.assertEqual(set(partners.ids), {self.contains.id, self.prefix.id, self.email.id})
+            # pages of the search
+            page = self.env['res.partner']._salesman_search('qwzmadu', limit=2, offset=2)
+            self.assertEqual(page, self.contains)
+
+    def test_domain_and_users(self):
+        partners = self.env['res.partner']._salesman_search(
+            'qwzmadu', domain=[('id', '!=', self.prefix.id)])
+        self.assertNotIn(self.prefix, partners)
+        user = self.env['res.users'].create({'name': 'Qwzmadu Salesman', 'login': 'salesman_qwz'})
+        self.assertEqual(self.env['res.users']._salesman_search('salesman_qw'), user)
+        self.assertEqual(self.env['res.users']._salesman_search('qwzmadu sales'), user)
@@ -0,0 +1,135 @@
+import json
+
+from odoo.tests import HttpCase, tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.stock_quant import availability_cache
+
+
+class TestStockAvailability(TransactionCase):
+
+    def setUp(self):
+        super(TestStockAvailability, self).setUp()
+        self.warehouse = self.env['stock.warehouse'].search(
+            [('company_id', '=', self.env.company.id)], limit=1)
+        self.stock_location = self.warehouse.lot_stock_id
+        self.product_1 = self.env['product.product'].create({
+            'name': 'Storable Product 1',
+            'detailed_type': 'product',
+        })
+        self.product_2 = self.env['product.product'].create({
+            'name': 'Storable Product 2',
+            'detailed_type': 'product',
+        })
+        self.Quant = self.env['stock.quant']
+        self.Quant._update_available_quantity(self.product_1, self.stock_location, 10.0)
+        availability_cache.clear()
+
+    def test_batch_quantities(self):
+        quantities = self.Quant._salesman_get_available_quantities(
+            self.product_1 | self.product_2, self.warehouse)
+        self.assertEqual(quantities[(self.product_1.id, self.warehouse.id)], 10.0)
+        self.assertEqual(quantities[(self.product_2.id, self.warehouse.id)], 0.0)
+
+    def test_cache_hit_and_invalidation(self):
+        self.Quant._salesman_get_available_quantities(self.product_1, self.warehouse)
+        hits = availability_cache.hits
+        quantities = self.Quant._salesman_get_available_quantities(self.product_1, self.warehouse)
+        self.assertEqual(availability_cache.hits, hits + 1)
+        self.assertEqual(quantities[(self.product_1.id, self.warehouse.id)], 10.0)
+
+        self.Quant._update_available_quantity(self.product_1, self.stock_location, 5.0)
+        quantities = self.Quant._salesman_get_available_quantities(self.product_1, self.warehouse)
+        self.assertEqual(quantities[(self.product_1.id, self.warehouse.id)], 15.0)
+
+    def test_strict_bypasses_cache(self):
+        self.Quant._salesman_get_available_quantities(self.product_1, self.warehouse)
+        hits = availability_cache.hits
+        self.Quant._salesman_get_available_quantities(self.product_1, self.warehouse, use_cache=False)
+        self.assertEqual(availability_cache.hits, hits)
+
+
+@tagged('-at_install', 'post_install')
+class TestStockAvailabilityController(HttpCase):
+
+    def setUp(self):
+        super(TestStockAvailabilityController, self).setUp()
+        self.authenticate('admin', 'admin')
+        self.warehouse = self.env['stock.warehouse'].search(
+            [('company_id', '=', self.env.company.id)], limit=1)
+        self.product_1 = self.env['product.product'].create({
+            'name': 'Storable Product 1',
+            'detailed_type': 'product',
+        })
+        self.product_2 = self.env['product.product'].create({
+            'name': 'Storable Product 2',
+            'detailed_type': 'product',
+        })
+        self.service = self.env['product.product'].create({
+            'name': 'Service Product',
+            'detailed_type': 'service',
+        })
+        self.env['stock.quant']._update_available_quantity(self.product_1, self.warehouse.lot_stock_id, 10.0)
+        self.env['stock.quant']._update_available_quantity(self.product_2, self.warehouse.lot_stock_id, 1.0)
+        availability_cache.clear()
+
+    def _check_availability(self, data):
+        self.env.flush_all()
+        response = self.opener.request(
+            'GET', self.base_url() + '/api/get-product-availability', data=json.dumps(data),
+            headers={'Content-Type': 'application/json'})
+        return response.json()['result']
+
+    def test_batch_lines(self):
+        result = self._check_availability({'lines': [
+            {'product_id': self.product_1.id, 'requesting_qty': 4},
+            {'product_id': self.product_2.id, 'requesting_qty': 3},
+            {'product_id': self.service.id, 'requesting_qty': 1},
+            {'product_id': 0, 'requesting_qty': 1},
+        ]})
+        self.assertFalse(result['success'])
+        available, short, service, missing = result['data']
+        self.assertTrue(available['is_available'])
+        self.assertEqual(available['available_quantity'], 10.0)
+        self.assertEqual(available['warehouses'], [{'warehouse_id': self.warehouse.id, 'available_quantity': 10.0}])
+        self.assertFalse(short['is_available'])
+        self.assertEqual(short['short_quantity'], 2.0)
+        self.assertFalse(service['is_available'])
+        self.assertEqual(missing['message'], 'No product found')
+
+    def test_batch_all_available(self):
+        result = self._check_availability({
+            'lines': [
+                {'product_id': self.product_1.id, 'requesting_qty': 10},
+                {'product_id': self.product_2.id, 'requesting_qty': 1},
+            ],
+            'warehouse_ids': [self.warehouse.id],
+            'strict': True,
+        })
+        self.assertTrue(result['success'])
+        self.assertEqual([line['short_quantity'] for line in result['data']], [0.0, 0.0])
+
+    def test_batch_other_warehouse(self):
+        other = self.env['stock.warehouse'].create({'name': 'Other Warehouse', 'code': 'OTWH'})
+        self.env['stock.quant']._update_available_quantity(self.product_1, other.lot_stock_id, 3.0)
+        lines = [{'product_id': self.product_1.id, 'requesting_qty': 2}]
+        branch_ids, _warehouse_ids = self.env['salesman.reference.resolver']._get_branch_scope(
+            self.env.ref('base.user_admin').id, self.env.company.id)
+        if branch_ids is None:
+            # a user without branch checks any warehouse of the company
+            result = self._check_availability({'lines': lines, 'warehouse_ids': [other.id]})
+            self.assertTrue(result['success'])
+            self.assertEqual(result['data'][0]['warehouses'], [{'warehouse_id': other.id, 'available_quantity': 3.0}])
+
+        if 'multi.branch' not in self.env or 'branch_id' not in other._fields \
+                or 'branch_id' not in self.env.user._fields:
+            return
+        branch = self.env['multi.branch'].create({'name': 'Availability Branch'})
+        self.warehouse.branch_id = branch
+        self.env.ref('base.user_admin').branch_id = branch
+        # the warehouses out of the branches of the user are ignored
+        result = self._check_availability({'lines': lines, 'warehouse_ids': [other.id]})
+        self.assertFalse(result['success'])
+        self.assertEqual(result['message'], 'No warehouse found')
+        result = self._check_availability({'lines': lines, 'warehouse_ids': [self.warehouse.id, other.id]})
+        self.assertEqual(result['data'][0]['warehouses'], [{'warehouse_id': self.warehouse.id, 'available_quantity': 10.0}])
@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from odoo.tests.common import TransactionCase
+
+from ..models.sync_bundle import zstandard
+
+
+class TestSyncBundle(TransactionCase):
+
+    def setUp(self):
+        super(TestSyncBundle, self).setUp()
+        self.Bundle = self.env['salesman.sync.bundle']
+        self.product = self.env['product.product'].create({
+            'name': 'Bundled Product',
+            'list_price': 42.0,
+        })
+
+    def _read(self, bundle):
+        raw = bundle.attachment_id.raw
+        if bundle.encoding == 'zstd':
+            return json.loads(zstandard.ZstdDecompressor().decompress(raw))
+        return json.loads(gzip.decompress(raw))
+
+    def test_build_and_version(self):
+        bundle = self.Bundle._salesman_build_bundle(self.env.company, self.env.user)
+        content = self._read(bundle)
+        self.assertEqual(content['version'], 1)
+        products = {prd['id']: prd for prd in content['products']}
+        self.assertEqual(products[self.product.id]['sale_price'], 42.0)
+
+        attachment = bundle.attachment_id
+        self.Bundle._salesman_build_bundle(self.env.company, self.env.user)
+        self.assertEqual(bundle.version, 1)
+        self.assertEqual(bundle.attachment_id, attachment)
+
+        self.product.list_price = 50.0
+        self.Bundle._salesman_build_bundle(self.env.company, self.env.user)
+        self.assertEqual(bundle.version, 2)
+        self.assertFalse(attachment.exists())
+        self.assertEqual(self._read(bundle)['version'], 2)
+
+    def test_shared_scope(self):
+        salesmen = self.env['res.users'].create([{
+            'name': f'Bundle Salesman {index}',
+            'login': f'bundle_salesman_{index}',
+            'groups_id': [(6, 0, [self.env.ref('sales_team.group_sale_salesman').id])],
+        } for index in range(2)])
+        first = self.Bundle._salesman_build_bundle(self.env.company, salesmen[0])
+        second = self.Bundle._salesman_build_bundle(self.env.company, salesmen[1])
+        # the salesmen without branch share the bundle of the company
+        self.assertEqual(first, second)
+        self.assertEqual(first.scope_key, 'all')
+        self.assertIsNone(self._read(first)['branch_ids'])
+
+        self.Bundle._salesman_build_bundles()
+        bundles = self.Bundle.search([('company_id', '=', self.env.company.id)])
+        self.assertEqual(bundles, first)
+        self.assertEqual(first.version, 1)
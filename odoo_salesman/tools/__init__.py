@@ -0,0 +1,3 @@
+from .cache import TTLCache
+from .geo import GridIndex, haversine
+from .search import ensure_trgm, ranked_search
@@ -0,0 +1,109 @@
+import math
+import threading
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    '''returns the great circle distance in km between two points'''
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridIndex:
+    '''Thread safe in-memory index of points on a grid of cell_size degrees.
+    The nearest points are found by scanning the cells ring by ring around the
+    query point until no unscanned cell can hold a closer point, the longitudes
+    do not wrap around the antimeridian.
+    '''
+
+    def __init__(self, cell_size=0.1):
+        self.cell_size = cell_size
+        self.watermark = None
+        self.refreshed_at = None
+        self.lock = threading.RLock()
+        self._points = {}  # id: (lat, lon)
+        self._cells = {}  # (row, col): ids
+        self._bounds = None  # (min_row, max_row, min_col, max_col) of the cells ever used
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_size), math.floor(lon / self.cell_size)
+
+    def upsert(self, key, lat, lon):
+        with self.lock:
+            self.remove(key)
+            cell = self._cell(lat, lon)
+            self._points[key] = (lat, lon)
+            self._cells.setdefault(cell, set()).add(key)
+            row, col = cell
+            if self._bounds is None:
+                self._bounds = (row, row, col, col)
+            else:
+                min_row, max_row, min_col, max_col = self._bounds
+                self._bounds = (min(min_row, row), max(max_row, row), min(min_col, col), max(max_col, col))
+
+    def remove(self, key):
+        with self.lock:
+            point = self._points.pop(key, None)
+            if point is None:
+                return
+            cell = self._cell(*point)
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cell]
+
+    def clear(self):
+        with self.lock:
+            self._points.clear()
+            self._cells.clear()
+            self._bounds = None
+            self.watermark = None
+            self.refreshed_at = None
+
+    def nearest(self, lat, lon, k, radius_km=None, exclude=()):
+        '''returns up to k (distance_km, key) of the points closest to the
+        point, within radius_km when given, closest first'''
+        with self.lock:
+            if not self._points or k <= 0:
+                return []
+            row, col = self._cell(lat, lon)
+            min_row, max_row, min_col, max_col = self._bounds
+            last_ring = max(row - min_row, max_row - row, col - min_col, max_col - col)
+            found = []
+            ring = 0
+            while ring <= last_ring:
+                for cell in self._ring_cells(row, col, ring):
+                    for key in self._cells.get(cell, ()):
+                        if key in exclude:
+                            continue
+                        distance = haversine(lat, lon, *self._points[key])
+                        if radius_km is None or distance <= radius_km:
+                            found.append((distance, key))
+                # every point out of the scanned rings is at least this far
+                edge = ring * self.cell_size
+                covered_km = edge * KM_PER_DEGREE * min(1.0, math.cos(math.radians(min(abs(lat) + edge, 90))))
+                if radius_km is not None and covered_km >= radius_km:
+                    break
+                if len(found) >= k and sorted(found)[k - 1][0] <= covered_km:
+                    break
+                ring += 1
+            return sorted(found)[:k]
+
+    @staticmethod
+    def _ring_cells(row, col, ring):
+        if ring == 0:
+            yield row, col
+            return
+        for delta in range(-ring, ring + 1):
+            yield row - ring, col + delta
+            yield row + ring, col + delta
+        for delta in range(-ring + 1, ring):
+            yield row + delta, col - ring
+            yield row + delta, col + ring
@@ -0,0 +1,153 @@
+'''Per worker performance metrics of the salesman API routes.
+
+Every instrumented request records its wall time, SQL query count and time,
+payload size and result rows in a ring buffer per (route, operation), the
+/api/v1/metrics route renders them in the Prometheus text format.
+'''
+import functools
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+# samples kept per (route, operation) to compute the quantiles
+RING_SIZE = 1000
+# queries kept per request for the slow request log
+MAX_CAPTURED_QUERIES = 200
+# requests slower than this are logged with their queries, the
+# odoo_salesman.slow_request_ms parameter overrides it
+SLOW_REQUEST_MS = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+# metric name, help, sample index
+METRICS = [
+    ('salesman_request_duration_seconds', 'Wall time of the requests', 0),
+    ('salesman_request_sql_queries', 'SQL queries run by the requests', 1),
+    ('salesman_request_sql_duration_seconds', 'Time spent in SQL by the requests', 2),
+    ('salesman_request_payload_bytes', 'Size of the request payloads', 3),
+    ('salesman_request_result_rows', 'Rows returned by the requests', 4),
+]
+
+_lock = threading.Lock()
+_local = threading.local()
+_samples = defaultdict(lambda: deque(maxlen=RING_SIZE))  # (route, operation): deque of samples
+_totals = defaultdict(lambda: [0, [0.0] * len(METRICS)])  # (route, operation): [count, sums]
+
+
+def annotate(**values):
+    '''sets the labels of the running request, e.g annotate(operation='create')'''
+    current = getattr(_local, 'current', None)
+    if current is not None:
+        current.update(values)
+
+
+def instrument(func):
+    '''records the metrics of every call of the route, to put under @http.route'''
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        # read upfront, the transaction may be aborted once the route is over
+        slow_ms = int(request.env['ir.config_parameter'].sudo().get_param(
+            'odoo_salesman.slow_request_ms', SLOW_REQUEST_MS))
+        # slowest queries of the request as a min heap of (delay, seq, query)
+        queries, sql = [], {'count': 0, 'time': 0.0}
+        sequence = itertools.count()
+
+        def query_hook(cr, query, params, start, delay):
+            sql['count'] += 1
+            sql['time'] += delay
+            item = (delay, next(sequence), query)
+            if len(queries) < MAX_CAPTURED_QUERIES:
+                heapq.heappush(queries, item)
+            else:
+                heapq.heappushpop(queries, item)
+        # called by odoo.sql_db.Cursor.execute after every query of the thread
+        thread = threading.current_thread()
+        if not hasattr(thread, 'query_hooks'):
+            thread.query_hooks = []
+        thread.query_hooks.append(query_hook)
+        _local.current = {'operation': ''}
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(self, *args, **kwargs)
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            thread.query_hooks.remove(query_hook)
+            labels, _local.current = _local.current, None
+            _record(
+                func.__name__, labels['operation'] or '', queries, slow_ms,
+                duration=duration,
+                query_count=sql['count'],
+                query_time=sql['time'],
+                payload_size=len(request.httprequest.get_data(cache=True)),
+                rows=_count_rows(result),
+            )
+    return wrapper
+
+
+def last_sample(route, operation=''):
+    '''returns the metrics of the last request of the route as a dict'''
+    with _lock:
+        samples = _samples.get((route, operation))
+        sample = samples[-1] if samples else None
+    if sample is None:
+        return None
+    return dict(zip(['duration', 'query_count', 'query_time', 'payload_size', 'rows'], sample))
+
+
+def _count_rows(result):
+    if not isinstance(result, dict):
+        return 0
+    data = result.get('data', result.get('result'))
+    if isinstance(data, list):
+        return len(data)
+    return 1 if data else 0
+
+
+def _record(route, operation, queries, slow_ms, duration, query_count, query_time, payload_size, rows):
+    key = (route, operation)
+    sample = (duration, query_count, query_time, payload_size, rows)
+    with _lock:
+        _samples[key].append(sample)
+        totals = _totals[key]
+        totals[0] += 1
+        totals[1] = [total + value for total, value in zip(totals[1], sample)]
+    if slow_ms and duration * 1000 >= slow_ms:
+        slowest = heapq.nlargest(20, queries)
+        _logger.warning(
+            "Slow salesman API request %s %s: %.0f ms, %s queries in %.0f ms, %s bytes, %s rows\n%s",
+            route, operation, duration * 1000, query_count, query_time * 1000, payload_size, rows,
+            '\n'.join(f"{delay * 1000:.1f} ms: {query.decode() if isinstance(query, bytes) else query}"
+                      for delay, _seq, query in slowest))
+
+
+def _quantile(values, quantile):
+    '''nearest rank quantile of sorted values'''
+    return values[min(int(quantile * len(values)), len(values) - 1)]
+
+
+def render_prometheus(extra_counters=()):
+    '''renders the collected metrics, extra_counters are (name, help, value)'''
+    with _lock:
+        samples = {key: list(values) for key, values in _samples.items()}
+        totals = {key: (count, list(sums)) for key, (count, sums) in _totals.items()}
+    lines = []
+    for name, help_text, index in METRICS:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} summary']
+        for (route, operation), values in sorted(samples.items()):
+            labels = f'route="{route}",operation="{operation}"'
+            ordered = sorted(value[index] for value in values)
+            for quantile in QUANTILES:
+                lines.append(f'{name}{{{labels},quantile="{quantile}"}} {_quantile(ordered, quantile)}')
+            count, sums = totals[(route, operation)]
+            lines.append(f'{name}_sum{{{labels}}} {sums[index]}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+    for name, help_text, value in extra_counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
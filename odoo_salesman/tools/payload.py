@@ -0,0 +1,121 @@
+'''Request layer shared by the salesman API routes.
+
+The JSON body of a request is parsed once, reusing the document Odoo already
+decoded for the type='json' routes, into a Payload whose typed getters raise
+a ValidationError on malformed values. handle_errors shapes the errors of
+every route the same way and dumps serializes to bytes, with orjson when it
+is installed, for the http routes and the stored responses.
+'''
+import functools
+import json
+import logging
+
+from odoo.exceptions import ValidationError
+from odoo.http import request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_logger = logging.getLogger(__name__)
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value, sort_keys=False):
+    '''serializes value to JSON bytes, the datetimes are written like str() of
+    them as the json module does with default=str'''
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, default=str, option=option)
+    return json.dumps(value, default=str, sort_keys=sort_keys).encode()
+
+
+class Payload(dict):
+    '''parsed body of a request with typed getters and the environment of the
+    request bound to it'''
+
+    def __init__(self, data, env):
+        super().__init__(data)
+        self.env = env
+
+    def get_int(self, key, required=False):
+        value = self.get(key)
+        if not value and not required:
+            return None
+        if type(value) != int:
+            raise ValidationError(f"{key} provided must be an integer")
+        return value
+
+    def get_int_list(self, key, required=False):
+        value = self.get(key)
+        if not value and not required:
+            return []
+        if not isinstance(value, list) or not value or any(type(item) != int for item in value):
+            raise ValidationError(f"{key} provided must be a list of integers")
+        return value
+
+    def get_list(self, key, required=False):
+        '''returns the list of objects of key, e.g the lines of an order'''
+        value = self.get(key)
+        if not value and not required:
+            return []
+        if not isinstance(value, list) or not value or any(not isinstance(item, dict) for item in value):
+            raise ValidationError(f"{key} provided must be a list of objects")
+        return value
+
+    def get_str(self, key, required=False):
+        value = self.get(key)
+        if not value and not required:
+            return None
+        if not isinstance(value, str) or not value:
+            raise ValidationError(f"{key} provided must be a string")
+        return value
+
+    def get_bool(self, key):
+        return bool(self.get(key))
+
+
+def get_payload():
+    '''returns the payload of the current request, parsed once'''
+    payload = getattr(request, '_salesman_payload', None)
+    if payload is not None:
+        return payload
+    data = getattr(getattr(request, 'dispatcher', None), 'jsonrequest', None)
+    if not isinstance(data, dict):
+        body = request.httprequest.get_data(cache=True)
+        try:
+            data = loads(body) if body else {}
+        except ValueError:
+            raise ValidationError("The request body must be a JSON document")
+        if not isinstance(data, dict):
+            raise ValidationError("The request body must be a JSON object")
+    request._salesman_payload = payload = Payload(data, request.env)
+    return payload
+
+
+def handle_errors(func):
+    '''answers the errors raised by a json route with the same response, to put
+    under @metrics.instrument: {'success': False, 'message': ...} with a 400
+    status_code for the invalid payloads, the changes of the request are
+    rolled back rather than committed half done
+    '''
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        except ValidationError as e:
+            request.env.cr.rollback()
+            return {'success': False, 'status_code': 400, 'message': str(e)}
+        except Exception as e:
+            request.env.cr.rollback()
+            _logger.exception("Salesman API route %s failed", func.__name__)
+            return {'success': False, 'message': str(e)}
+    return wrapper
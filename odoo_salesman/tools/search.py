@@ -0,0 +1,69 @@
+import logging
+
+import psycopg2
+
+from odoo.tools import mute_logger
+from odoo.tools.sql import escape_psql
+
+_logger = logging.getLogger(__name__)
+
+# {dbname: whether pg_trgm is installed}, the extension is only checked once per worker
+_trgm_installed = {}
+
+
+def ensure_trgm(cr):
+    '''installs the pg_trgm extension, returns False when the database user
+    is not allowed to do it'''
+    try:
+        with mute_logger('odoo.sql_db'), cr.savepoint(flush=False):
+            cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except psycopg2.Error:
+        _logger.warning("pg_trgm could not be installed, the salesman API search falls back to ILIKE")
+        return False
+    _trgm_installed[cr.dbname] = True
+    return True
+
+
+def has_trgm(cr):
+    if cr.dbname not in _trgm_installed:
+        cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        _trgm_installed[cr.dbname] = bool(cr.fetchone())
+    return _trgm_installed[cr.dbname]
+
+
+def ranked_search(model, domain, term, columns, join='', limit=20, offset=0):
+    '''returns the ids of the records of model matching term on any of the
+    columns (qualified SQL expressions), the access rules of the user apply
+    the records with a column starting with term come first, then the most
+    similar ones when pg_trgm is installed, whose GIN indexes serve the
+    contains/fuzzy match
+    '''
+    query = model._where_calc(domain)
+    model._apply_ir_rules(query, 'read')
+    from_clause, where_clause, where_params = query.get_sql()
+    term = term.strip()
+    contains = f'%{escape_psql(term)}%'
+    prefix = f'{escape_psql(term)}%'
+    trgm = has_trgm(model.env.cr)
+
+    match = ' OR '.join(f'{column} ILIKE %s' for column in columns)
+    match_params = [contains] * len(columns)
+    if trgm:
+        match += f' OR {columns[0]} %% %s'
+        match_params.append(term)
+    prefix_rank = ' OR '.join(f'{column} ILIKE %s' for column in columns)
+    order = f'({prefix_rank}) DESC'
+    order_params = [prefix] * len(columns)
+    if trgm:
+        order += ', GREATEST({}) DESC'.format(
+            ', '.join(f"similarity(COALESCE({column}, ''), %s)" for column in columns))
+        order_params += [term] * len(columns)
+
+    model.env.cr.execute(f"""
+        SELECT "{model._table}".id
+          FROM {from_clause} {join}
+         WHERE {where_clause or 'TRUE'} AND ({match})
+      ORDER BY {order}, "{model._table}".id
+         LIMIT %s OFFSET %s
+    """, where_params + match_params + order_params + [limit, offset])
+    return [row[0] for row in model.env.cr.fetchall()]